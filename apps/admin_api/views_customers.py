@@ -25,6 +25,10 @@ from apps.orders.models import Order
 # Tras marcar envío, la orden pasa a SHIPPED y ya no es PAID; el CRM debe seguir contándolas.
 _CRM_REVENUE_STATUSES = (Order.Status.PAID, Order.Status.SHIPPED)
 
+# Búsqueda "CC 243234234" / "nit 900123456": separadores → espacio, luego tipo + cédula.
+_DOC_SEPARATORS_RE = re.compile(r"[\s.\-_]+")
+_DOC_TYPE_AND_NUMBER_RE = re.compile(r"^([A-Za-z]{1,10})\s+(\d{5,20})$")
+
 
 def _customer_metrics(customer: Customer) -> dict:
     paid_orders = Order.objects.filter(
@@ -129,8 +133,8 @@ def customers_list(request: Request):
         if digits:
             doc_filter |= Q(cedula__icontains=digits)
         # "CC 243234234" / "nit 900123456" → tipo + cédula exacta en campos separados
-        compact = re.sub(r"[\s.\-_]+", " ", s).strip()
-        m_doc = re.match(r"^([A-Za-z]{1,10})\s+(\d{5,20})$", compact)
+        compact = _DOC_SEPARATORS_RE.sub(" ", s).strip()
+        m_doc = _DOC_TYPE_AND_NUMBER_RE.match(compact)
         if m_doc:
             doc_filter |= Q(document_type__iexact=m_doc.group(1)) & Q(cedula=m_doc.group(2))
         qs = qs.filter(
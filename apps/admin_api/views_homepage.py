@@ -38,7 +38,7 @@ def _banner_dict(request: Request, b: HomepageBanner) -> dict:
     thumb = None
     if b.image:
         try:
-            thumb = getattr(b.image_thumb, "url", None) or b.image.url
+            thumb = b.image_thumb_url or b.image.url
         except Exception:
             thumb = None
     return {
@@ -60,7 +60,7 @@ def _promo_dict(request: Request, p: HomepagePromo) -> dict:
     thumb = None
     if p.image:
         try:
-            thumb = getattr(p.image_thumb, "url", None) or p.image.url
+            thumb = p.image_thumb_url or p.image.url
         except Exception:
             thumb = None
     return {
@@ -51,7 +51,7 @@ def _serialize_color_image(request: Request, img: ProductColorImage) -> dict:
     thumb = None
     if getattr(img, "image", None):
         try:
-            thumb = getattr(img.image_thumb, "url", None) or img.image.url
+            thumb = img.image_thumb_url or img.image.url
         except Exception:
             thumb = None
     return {
@@ -73,7 +73,7 @@ def _serialize_product(p: Product) -> dict:
         img = p.color_images.order_by("-is_primary", "sort_order", "created_at", "id").first()
         if img and getattr(img, "image", None):
             try:
-                primary_image = getattr(img.image_thumb, "url", None) or img.image.url
+                primary_image = img.image_thumb_url or img.image.url
             except Exception:
                 try:
                     primary_image = img.image.url
@@ -163,12 +163,15 @@ def products_list(request: Request):
     offset = (page - 1) * page_size
     total = qs.count()
 
+    # total_stock suma el pool de la categoría: prefetch solo para la página.
+    page_qs = qs.prefetch_related("category__inventory_pools")[offset: offset + page_size]
+
     return Response({
         "count": total,
         "page": page,
         "page_size": page_size,
         "total_pages": max(1, (total + page_size - 1) // page_size),
-        "results": [_serialize_product(p) for p in qs[offset: offset + page_size]],
+        "results": [_serialize_product(p) for p in page_qs],
     })
 
 
@@ -593,8 +593,36 @@ class ProductVariantInline(admin.TabularInline):
 # ProductImage Inline
 # ======================
 
+class ProductImageInlineFormSet(forms.BaseInlineFormSet):
+    """Valida "una sola imagen principal por variante" sobre el estado final del inline.
+
+    Cuenta filas existentes y nuevas (sin las marcadas para borrar): si hay más de
+    una principal se muestra error en el formulario en vez de corregir al usuario
+    o dejar que la constraint de la DB devuelva un 500.
+    """
+
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+
+        primaries = 0
+        for form in self.forms:
+            data = getattr(form, "cleaned_data", None) or {}
+            if not data or data.get("DELETE"):
+                continue
+            if data.get("is_primary"):
+                primaries += 1
+
+        if primaries > 1:
+            raise forms.ValidationError(
+                "Solo puede haber una imagen principal por variante. Desmarca las demás."
+            )
+
+
 class ProductImageInline(admin.TabularInline):
     model = ProductImage
+    formset = ProductImageInlineFormSet
     extra = 1
     fields = ("image", "alt_text", "is_primary", "sort_order")
     readonly_fields = ("created_at",)
@@ -655,7 +683,8 @@ class ProductAdmin(admin.ModelAdmin):
         "created_at",
     )
 
-    list_select_related = ("category",)
+    # Category.__str__ incluye el departamento.
+    list_select_related = ("category", "category__department")
     search_fields = ("name", "slug")
     list_filter = ("is_active", "show_in_home_marquee", "category")
     prepopulated_fields = {"slug": ("name",)}
@@ -694,6 +723,11 @@ class ProductAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        # `variants_stock_total` suma el pool de la categoría: prefetch para no
+        # lanzar un SUM por fila del changelist.
+        return super().get_queryset(request).prefetch_related("category__inventory_pools")
+
     @admin.action(description="Generar variantes desde pool")
     def generate_variants_from_pool_action(self, request, queryset):
         """Crea ProductVariant por cada (value, color) existente en InventoryPool para la categoría del producto."""
@@ -774,7 +808,7 @@ class ProductVariantAdmin(admin.ModelAdmin):
     form = ProductVariantAdminForm
     autocomplete_fields = ("product",)
     list_display = ("product_category_label", "value", "color", "stock", "is_active")
-    list_select_related = ("product", "product__category")
+    list_select_related = ("product", "product__category", "product__category__department")
     list_filter = ("product__category__department", "product__category", "is_active")
     search_fields = ("product__name", "value", "color")
     ordering = ("product", "value", "color")
@@ -790,6 +824,45 @@ class ProductVariantAdmin(admin.ModelAdmin):
     # la PDP migra completamente a ProductColorImage para categorías SIZE_COLOR.
     inlines = [ProductImageInline]
 
+    def save_formset(self, request, form, formset, change):
+        """Guarda las imágenes nuevas del inline en un solo INSERT.
+
+        `ProductImage.save()` por fila cuesta full_clean + 2 exists() + INSERT.
+        El ModelForm ya corrió full_clean de cada fila (y el formset la principal
+        única), así que las nuevas van por bulk_create; la primaria faltante se
+        asigna en un UPDATE y la optimización + derivados corren tras el commit,
+        igual que en save().
+        """
+        if formset.model is not ProductImage:
+            return super().save_formset(request, form, formset, change)
+
+        instances = formset.save(commit=False)
+        for obj in formset.deleted_objects:
+            obj.delete()
+
+        new_objs = [obj for obj in instances if obj.pk is None]
+        # El formset ya validó una sola principal en el estado final. Guardar primero
+        # las que dejan de ser principal evita choques transitorios con la constraint.
+        existing = sorted(
+            (obj for obj in instances if obj.pk is not None), key=lambda obj: obj.is_primary
+        )
+        for obj in existing:
+            obj.save()
+
+        if new_objs:
+            ProductImage.objects.bulk_create(new_objs)
+
+            def _process_all():
+                # Mismo post-commit que ProductImage.save(): optimización + derivados.
+                for obj in new_objs:
+                    obj.process_uploaded_image()
+
+            transaction.on_commit(_process_all)
+
+        # Todas las filas del inline son de esta variante.
+        ProductImage.ensure_primary_for_variants({form.instance.pk})
+        formset.save_m2m()
+
     def _is_orders_variant_selector(self, request) -> bool:
         """Detecta cuándo ProductVariant se está usando como selector desde Orders.
 
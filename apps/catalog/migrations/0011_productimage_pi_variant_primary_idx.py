@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-16 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_alter_homepagesection_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productimage',
+            index=models.Index(fields=['variant', '-is_primary', 'sort_order', 'created_at'], name='pi_variant_primary_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.11 on 2026-10-16 10:40
+
+from django.db import migrations, models
+
+
+def _dedupe_primary_images(apps, schema_editor):
+    """Deja una sola primaria por variante (la primera por sort_order/created_at/id)."""
+    ProductImage = apps.get_model("catalog", "ProductImage")
+    seen = set()
+    duplicates = []
+    rows = (
+        ProductImage.objects.filter(is_primary=True)
+        .order_by("variant_id", "sort_order", "created_at", "id")
+        .values_list("id", "variant_id")
+    )
+    for image_id, variant_id in rows:
+        if variant_id in seen:
+            duplicates.append(image_id)
+        else:
+            seen.add(variant_id)
+    if duplicates:
+        ProductImage.objects.filter(id__in=duplicates).update(is_primary=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0011_productimage_pi_variant_primary_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(_dedupe_primary_images, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='productimage',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_primary', True)), fields=('variant',), name='uniq_primary_image_per_variant', violation_error_message='Ya existe una imagen marcada como principal para esta variante.'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-16 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0012_productimage_uniq_primary_image_per_variant'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productvariant',
+            index=models.Index(fields=['product', 'is_active'], name='pv_product_active_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.11 on 2026-10-16 12:10
+
+from django.db import migrations, models
+
+
+def _backfill_effective_inventory(apps, schema_editor):
+    """effective_stock = max(stock del pool por variante activa); sold_out = effective_stock <= 0.
+
+    Misma normalización de keys que `services.inventory` (value upper, color strip).
+    """
+    InventoryPool = apps.get_model("catalog", "InventoryPool")
+    Product = apps.get_model("catalog", "Product")
+    ProductVariant = apps.get_model("catalog", "ProductVariant")
+
+    pools = {}
+    rows = InventoryPool.objects.filter(is_active=True).values_list(
+        "category_id", "value", "color", "quantity"
+    )
+    for category_id, value, color, qty in rows:
+        key = (category_id, str(value or "").strip().upper(), str(color or "").strip())
+        pools[key] = int(qty or 0)
+
+    product_categories = dict(Product.objects.values_list("id", "category_id"))
+    stock_by_product = {}
+    variants = ProductVariant.objects.filter(is_active=True).values_list("product_id", "value", "color")
+    for product_id, value, color in variants:
+        key = (
+            product_categories.get(product_id),
+            str(value or "").strip().upper(),
+            str(color or "").strip(),
+        )
+        available = pools.get(key, 0)
+        if available > stock_by_product.get(product_id, 0):
+            stock_by_product[product_id] = available
+
+    changed = []
+    for product_id, stock in stock_by_product.items():
+        changed.append(Product(id=product_id, effective_stock=stock, sold_out=False))
+    if changed:
+        Product.objects.bulk_update(changed, ["effective_stock", "sold_out"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0013_productvariant_pv_product_active_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='effective_stock',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sold_out',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.RunPython(_backfill_effective_inventory, migrations.RunPython.noop),
+    ]
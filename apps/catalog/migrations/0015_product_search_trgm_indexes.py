@@ -0,0 +1,44 @@
+# Generated by Django 5.2.11 on 2026-10-16 12:40
+
+from django.db import migrations
+
+
+# Índices trigram (pg_trgm) para el `?search=` del listado. `icontains` en
+# PostgreSQL compila a `UPPER("col"::text) LIKE UPPER(%s)`, así que el índice
+# GIN se crea sobre esa misma expresión (no sobre la columna cruda): cada rama
+# del OR (name / description) usa su índice (BitmapOr) en vez de seq scan.
+# Solo PostgreSQL; en SQLite (dev sin DATABASE_URL) no hace nada.
+_TRGM_INDEXES = (
+    ("catalog_product_name_upper_trgm", "name"),
+    ("catalog_product_description_upper_trgm", "description"),
+)
+
+
+def _create_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("catalog", "Product")._meta.db_table
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for name, column in _TRGM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" '
+            f'USING GIN ((UPPER("{column}"::text)) gin_trgm_ops);'
+        )
+
+
+def _drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _column in _TRGM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name};")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0014_product_effective_stock_sold_out'),
+    ]
+
+    operations = [
+        migrations.RunPython(_create_trgm_indexes, _drop_trgm_indexes),
+    ]
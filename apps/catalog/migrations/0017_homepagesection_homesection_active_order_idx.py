@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-16 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0016_product_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='homepagesection',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['sort_order', 'id'], name='homesection_active_order_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-16 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0017_homepagesection_homesection_active_order_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='homepagepromo',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['placement', 'sort_order', 'id'], name='promo_active_placement_idx'),
+        ),
+    ]
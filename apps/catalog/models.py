@@ -1,9 +1,11 @@
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import Sum
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Exists, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
 import os
-import uuid
+from contextlib import nullcontext
+from secrets import token_hex
 
 from django.utils.text import slugify
 
@@ -12,10 +14,10 @@ from imagekit.cachefiles import ImageCacheFile
 from imagekit.processors import ResizeToFit
 
 from .variant_rules import (
+    get_variant_choices,
     get_variant_rule,
     normalize_variant_value,
     normalize_variant_color,
-    resolve_variant_rule,
 )
 
 
@@ -256,11 +258,31 @@ class Product(models.Model):
     # Este campo puede reflejar un agregado del pool para la categoría del producto.
     stock = models.PositiveIntegerField(default=0, editable=False)
 
+    # Inventario efectivo DENORMALIZADO para listados (mismo contrato que la API:
+    # max(stock disponible por variante activa), no la suma del pool).
+    # Lo mantienen las señales de InventoryPool/ProductVariant vía
+    # `services.inventory.recompute_effective_inventory`; la PDP lo sigue
+    # calculando en vivo desde el pool.
+    effective_stock = models.PositiveIntegerField(default=0, editable=False)
+    sold_out = models.BooleanField(default=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at", "id"]
+        indexes = [
+            # Listado público: filtro is_active (+ categoría) y orden -created_at, id
+            # resueltos por index range scan, sin Sort sobre todo el catálogo.
+            models.Index(
+                fields=["is_active", "category", "-created_at", "id"],
+                name="prod_list_idx",
+            ),
+            models.Index(
+                fields=["is_active", "-created_at", "id"],
+                name="prod_active_recent_idx",
+            ),
+        ]
 
     def clean(self):
         super().clean()
@@ -276,7 +298,7 @@ class Product(models.Model):
             })
 
         # Si está activo, debe haber stock disponible (derivado del InventoryPool).
-        if self.is_active and self.total_stock <= 0:
+        if self.is_active and not self.has_available_stock():
             raise ValidationError({
                 "is_active": "No puedes activar un producto sin stock disponible (InventoryPool)."
             })
@@ -287,15 +309,51 @@ class Product(models.Model):
 
         Ojo: al ser un pool global, este stock NO es exclusivo del producto/diseño;
         es la disponibilidad de la base en esa categoría.
+
+        Performance:
+        - Si la categoría trae `inventory_pools` prefetched, se suma en Python (0 queries).
+        - Sin memo por instancia: el pool cambia fuera de este objeto (órdenes,
+          admin), así que cada acceso refleja el estado actual.
         """
         if not self.category_id:
             return 0
+
+        pools = None
+        if type(self).category.is_cached(self):
+            prefetched = getattr(self.category, "_prefetched_objects_cache", None) or {}
+            pools = prefetched.get("inventory_pools")
+
+        if pools is not None:
+            return sum(int(pool.quantity or 0) for pool in pools if pool.is_active)
+
         agg = InventoryPool.objects.filter(
             category_id=self.category_id,
             is_active=True,
         ).aggregate(total=Sum("quantity"))
         return int(agg["total"] or 0)
 
+    def has_available_stock(self) -> bool:
+        """True si algún pool activo de la categoría tiene cantidad > 0.
+
+        Equivale a `total_stock > 0` (quantity no es negativa) sin sumar todo el
+        pool: reutiliza el prefetch si existe y, si no, hace un EXISTS que corta
+        en la primera fila.
+        """
+        if not self.category_id:
+            return False
+
+        if type(self).category.is_cached(self):
+            prefetched = getattr(self.category, "_prefetched_objects_cache", None) or {}
+            pools = prefetched.get("inventory_pools")
+            if pools is not None:
+                return any(pool.is_active and (pool.quantity or 0) > 0 for pool in pools)
+
+        return InventoryPool.objects.filter(
+            category_id=self.category_id,
+            is_active=True,
+            quantity__gt=0,
+        ).exists()
+
     def get_stock_total(self) -> int:
         """Fuente de verdad del stock del producto (suma de variantes activas).
 
@@ -327,9 +385,40 @@ class Product(models.Model):
         if not (self.slug or "").strip():
             self.slug = self._generate_unique_slug()
         # Mantener campo legacy sincronizado con agregado del pool.
-        self.stock = self.total_stock
+        # Con update_fields sin "stock" el valor no se escribiría: no agregar.
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "stock" in update_fields:
+            self.stock = self.total_stock
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def recompute_stock_bulk(cls, product_ids=None, *, category_ids=None) -> int:
+        """Recalcula el `stock` legacy de muchos productos en un solo UPDATE.
+
+        UPDATE ... SET stock = COALESCE((SELECT SUM(quantity) FROM pool de la
+        categoría), 0) en vez de un SELECT + UPDATE por producto.
+        Retorna la cantidad de filas actualizadas.
+        """
+        pool_total = (
+            InventoryPool.objects.filter(category_id=OuterRef("category_id"), is_active=True)
+            .order_by()
+            .values("category_id")
+            .annotate(total=Sum("quantity"))
+            .values("total")[:1]
+        )
+
+        qs = cls.objects.all()
+        if product_ids is not None:
+            qs = qs.filter(id__in=[int(x) for x in product_ids if x])
+        if category_ids is not None:
+            qs = qs.filter(category_id__in=[int(x) for x in category_ids if x])
+
+        return qs.update(stock=Coalesce(Subquery(pool_total), 0))
+
+    def sync_stock(self) -> None:
+        """Recalcula y persiste solo el stock legacy (UPDATE de 2 columnas)."""
+        self.save(update_fields=["stock", "updated_at"])
+
 
 class InventoryPool(models.Model):
     """Fuente de verdad de inventario (pool global por base).
@@ -419,31 +508,177 @@ class InventoryAdjustmentLog(models.Model):
         return f"{self.inventory_pool} {sign}{diff}"
 
 
+def _unique_upload_name(filename) -> str:
+    """Nombre aleatorio (128 bits, hex) conservando la extensión en minúsculas."""
+    return f"{token_hex(16)}{os.path.splitext(filename)[1].lower()}"
+
+
 def product_image_upload_path(instance, filename):
     """Generate upload path for product variant images with unique filenames."""
-    ext = os.path.splitext(filename)[1].lower()
-    variant_id = instance.variant.id if instance.variant_id else "unknown"
-    product_id = instance.variant.product.id if instance.variant_id else "unknown"
-    return f"products/{product_id}/variants/{variant_id}/{uuid.uuid4().hex}{ext}"
+    # Usar FKs crudos: `variant.product.id` dispara un SELECT de Product por upload.
+    variant_id = instance.variant_id or "unknown"
+    product_id = (instance.variant.product_id or "unknown") if instance.variant_id else "unknown"
+    return f"products/{product_id}/variants/{variant_id}/{_unique_upload_name(filename)}"
 
 
 def product_color_image_upload_path(instance, filename):
     """Generate upload path for product color images with unique filenames."""
-    ext = os.path.splitext(filename)[1].lower()
-    product_id = instance.product.id if instance.product_id else "unknown"
+    product_id = instance.product_id or "unknown"
     color_normalized = normalize_variant_color(instance.color) or "no-color"
-    return f"products/{product_id}/colors/{color_normalized}/{uuid.uuid4().hex}{ext}"
+    return f"products/{product_id}/colors/{color_normalized}/{_unique_upload_name(filename)}"
 
 
 def homepage_banner_upload_path(instance, filename):
     """Generate upload path for homepage hero banners."""
-    ext = os.path.splitext(filename)[1].lower()
-    return f"homepage_banners/{uuid.uuid4().hex}{ext}"
+    return f"homepage_banners/{_unique_upload_name(filename)}"
+
 
 def homepage_promo_upload_path(instance, filename):
     """Generate upload path for homepage promo cards."""
-    ext = os.path.splitext(filename)[1].lower()
-    return f"homepage_promos/{uuid.uuid4().hex}{ext}"
+    return f"homepage_promos/{_unique_upload_name(filename)}"
+
+
+# Formatos reales (según Pillow) aceptados para uploads de imágenes.
+ALLOWED_IMAGE_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+
+def validate_image_upload(image_file, *, max_size: int, allowed_extensions) -> None:
+    """Valida un upload de imagen antes de que Pillow decodifique píxeles.
+
+    - Extensión: comparación de strings (sin IO).
+    - Tamaño: seek/tell sobre el archivo subido (sin leerlo).
+    - Formato: `Image.verify()` parsea solo headers; evita `.jpg` que no son JPEG.
+
+    Archivos ya guardados (`_committed`) solo validan extensión: se validaron al
+    subirse y así no se hace `storage.size()` (HEAD en R2) en cada clean().
+    """
+    if not image_file:
+        return
+
+    ext = os.path.splitext(image_file.name)[1].lower()
+    if ext not in allowed_extensions:
+        raise ValidationError(
+            {"image": f"Formato no permitido. Formatos permitidos: {', '.join(allowed_extensions)}"}
+        )
+
+    if getattr(image_file, "_committed", True):
+        return
+
+    fh = image_file.file
+    fh.seek(0, os.SEEK_END)
+    size = fh.tell()
+    fh.seek(0)
+    if size > max_size:
+        raise ValidationError(
+            {"image": f"El archivo es demasiado grande. Tamaño máximo: {max_size / (1024 * 1024):.1f}MB"}
+        )
+
+    from PIL import Image as PILImage
+
+    try:
+        with PILImage.open(fh) as img:
+            fmt = img.format
+            img.verify()
+    except Exception:
+        raise ValidationError({"image": "El archivo no es una imagen válida."})
+    finally:
+        fh.seek(0)
+
+    if fmt not in ALLOWED_IMAGE_FORMATS:
+        raise ValidationError(
+            {"image": f"Formato no permitido. Formatos permitidos: {', '.join(allowed_extensions)}"}
+        )
+
+
+def optimize_original_image(image_file) -> bool:
+    """Re-comprime en sitio el original JPEG/PNG de un ImageField.
+
+    - JPEG: optimize + progressive, quality=85 (RGB).
+    - PNG: optimize + compress_level=9 (sin pérdida, conserva alpha).
+    - WebP/otros: ya eficientes, no se tocan.
+    Retorna True si el archivo fue reescrito.
+    """
+    from PIL import Image as PILImage
+
+    path = image_file.path
+    with PILImage.open(path) as img:
+        img.load()
+        fmt = img.format
+        if fmt == "JPEG":
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            img.save(path, format="JPEG", optimize=True, quality=85, progressive=True)
+            return True
+        if fmt == "PNG":
+            img.save(path, format="PNG", optimize=True, compress_level=9)
+            return True
+    return False
+
+
+def image_cdn_enabled() -> bool:
+    """True si los derivados se sirven desde el CDN de imágenes (IMAGEKIT_ENDPOINT)."""
+    return bool(getattr(settings, "IMAGEKIT_ENDPOINT", ""))
+
+
+def image_cdn_url(image, transform: str) -> str:
+    """URL on-the-fly del CDN para un ImageField y una transformación `tr=`.
+
+    El CDN negocia WebP/AVIF según el header `Accept` (`f-auto`), así que no hay
+    encode en el servidor ni archivos derivados en storage.
+    Retorna "" si no hay endpoint configurado, imagen o transformación.
+    """
+    endpoint = getattr(settings, "IMAGEKIT_ENDPOINT", "") or ""
+    name = getattr(image, "name", "") or ""
+    if not endpoint or not name or not transform:
+        return ""
+    return f"{endpoint}/{name.lstrip('/')}?tr={transform}"
+
+
+def _cdn_transform(size: int, quality: int) -> str:
+    """Transformación `tr=` equivalente a ResizeToFit(size, size) + WebP(quality)."""
+    return f"w-{size},h-{size},c-at_max,f-auto,q-{quality}"
+
+
+# Mismos tamaños/calidades que los ImageSpecField de cada familia de modelos.
+PRODUCT_IMAGE_CDN_TRANSFORMS = {
+    "image_thumb": _cdn_transform(420, 75),
+    "image_medium": _cdn_transform(1200, 78),
+    "image_large": _cdn_transform(1600, 78),
+}
+HOMEPAGE_IMAGE_CDN_TRANSFORMS = {
+    "image_thumb": _cdn_transform(400, 82),
+    "image_medium": _cdn_transform(900, 82),
+    "image_large": _cdn_transform(1600, 82),
+}
+
+
+class CdnImageDerivativesMixin:
+    """Resuelve derivados (thumb/medium/large/...) vía CDN con fallback a ImageKit.
+
+    `CDN_TRANSFORMS` replica los tamaños/calidades de los ImageSpecField del modelo.
+    Sin IMAGEKIT_ENDPOINT se mantienen los cachefiles WebP locales (dev / sin CDN).
+    """
+
+    CDN_TRANSFORMS: dict[str, str] = {}
+
+    def cdn_derivative_url(self, spec_attr: str) -> str:
+        return image_cdn_url(getattr(self, "image", None), self.CDN_TRANSFORMS.get(spec_attr, ""))
+
+    def derivative_url(self, spec_attr: str) -> str:
+        image = getattr(self, "image", None)
+        if not image:
+            return ""
+
+        # Memo en la instancia: las propiedades *_url se leen varias veces por
+        # render (admin, emails) y cada `.url` de un spec rearma el cachefile.
+        # La clave incluye el nombre del archivo para invalidar al reemplazarlo.
+        cache = self.__dict__.setdefault("_derivative_url_cache", {})
+        key = (image.name, spec_attr)
+        url = cache.get(key)
+        if url is None:
+            url = self.cdn_derivative_url(spec_attr) or getattr(getattr(self, spec_attr, None), "url", "") or ""
+            cache[key] = url
+        return url
 
 
 def warm_imagekit_derivatives(instance, spec_names: tuple[str, ...]) -> None:
@@ -452,9 +687,10 @@ def warm_imagekit_derivatives(instance, spec_names: tuple[str, ...]) -> None:
     Objetivo:
     - Evitar que serializers caigan al original por no encontrar derivados aún no generados.
     - Hacer el trabajo una sola vez al guardar la imagen, no durante el render/API.
+    - Con CDN de imágenes activo no hay nada que generar: los derivados son URLs.
     """
     source_image = getattr(instance, "image", None)
-    if not source_image:
+    if not source_image or image_cdn_enabled():
         return
 
     for spec_name in spec_names:
@@ -469,7 +705,32 @@ def warm_imagekit_derivatives(instance, spec_names: tuple[str, ...]) -> None:
             continue
 
 
-class ProductImage(models.Model):
+def _is_unique_violation(exc, model, constraint_name: str, fields) -> bool:
+    """True si el IntegrityError proviene de la UniqueConstraint `constraint_name`.
+
+    Postgres incluye el nombre de la constraint en el mensaje; SQLite reporta
+    "UNIQUE constraint failed: tabla.col1, tabla.col2". Otros errores (NOT NULL,
+    FK) no coinciden aunque mencionen las mismas columnas.
+    """
+    message = str(exc)
+    if constraint_name in message:
+        return True
+    table = model._meta.db_table
+    columns = ", ".join(f"{table}.{model._meta.get_field(name).column}" for name in fields)
+    return message == f"UNIQUE constraint failed: {columns}"
+
+
+def _savepoint_if_in_atomic_block():
+    """Savepoint solo si ya hay una transacción abierta.
+
+    Así un IntegrityError traducido a ValidationError no deja abortada la
+    transacción del caller. En autocommit no hace falta: el INSERT/UPDATE
+    fallido no deja nada pendiente, y se evita el SAVEPOINT/RELEASE.
+    """
+    return transaction.atomic() if connection.in_atomic_block else nullcontext()
+
+
+class ProductImage(CdnImageDerivativesMixin, models.Model):
     """Modelo para almacenar imágenes de variantes de productos.
     
     Las imágenes están vinculadas a ProductVariant para permitir imágenes específicas
@@ -480,6 +741,7 @@ class ProductImage(models.Model):
     # Límites de validación
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
     ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+    CDN_TRANSFORMS = PRODUCT_IMAGE_CDN_TRANSFORMS
     
     variant = models.ForeignKey(
         'ProductVariant',
@@ -518,15 +780,15 @@ class ProductImage(models.Model):
 
     @property
     def image_thumb_url(self) -> str:
-        return getattr(self.image_thumb, 'url', '') if self.image else ''
+        return self.derivative_url("image_thumb")
 
     @property
     def image_medium_url(self) -> str:
-        return getattr(self.image_medium, 'url', '') if self.image else ''
+        return self.derivative_url("image_medium")
 
     @property
     def image_large_url(self) -> str:
-        return getattr(self.image_large, 'url', '') if self.image else ''
+        return self.derivative_url("image_large")
     alt_text = models.CharField(
         max_length=200,
         blank=True,
@@ -546,75 +808,89 @@ class ProductImage(models.Model):
         ordering = ["sort_order", "is_primary", "created_at"]
         verbose_name = "Imagen de variante"
         verbose_name_plural = "Imágenes de variantes"
+        indexes = [
+            # Soporta "primera imagen de la variante": order_by("-is_primary", "sort_order", "created_at").
+            models.Index(
+                fields=["variant", "-is_primary", "sort_order", "created_at"],
+                name="pi_variant_primary_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["variant"],
+                condition=Q(is_primary=True),
+                name="uniq_primary_image_per_variant",
+                violation_error_message="Ya existe una imagen marcada como principal para esta variante.",
+            ),
+        ]
     
     def clean(self):
         super().clean()
         
-        # Validar tamaño del archivo
-        if self.image:
-            if hasattr(self.image, 'size') and self.image.size:
-                if self.image.size > self.MAX_FILE_SIZE:
-                    raise ValidationError(
-                        {"image": f"El archivo es demasiado grande. Tamaño máximo: {self.MAX_FILE_SIZE / (1024 * 1024):.1f}MB"}
-                    )
-            
-            # Validar extensión
-            ext = os.path.splitext(self.image.name)[1].lower()
-            if ext not in self.ALLOWED_EXTENSIONS:
-                raise ValidationError(
-                    {"image": f"Formato no permitido. Formatos permitidos: {', '.join(self.ALLOWED_EXTENSIONS)}"}
-                )
-        
-        # Validar que solo haya una imagen primaria por variante
-        if self.is_primary and self.variant_id:
-            existing_primary = ProductImage.objects.filter(
-                variant_id=self.variant_id,
-                is_primary=True
-            ).exclude(pk=self.pk)
-            if existing_primary.exists():
-                raise ValidationError(
-                    {"is_primary": "Ya existe una imagen marcada como principal para esta variante."}
-                )
-    
+        # Validar extensión, tamaño y formato real (solo headers, sin decodificar)
+        validate_image_upload(
+            self.image,
+            max_size=self.MAX_FILE_SIZE,
+            allowed_extensions=self.ALLOWED_EXTENSIONS,
+        )
+
+        # "Una sola imagen primaria por variante" lo garantiza la DB
+        # (uniq_primary_image_per_variant); los ModelForm lo validan vía constraints.
+
     def save(self, *args, **kwargs):
-        # Validar antes de guardar
-        self.full_clean()
+        # Validar antes de guardar. La unicidad de la primaria la resuelve el
+        # INSERT/UPDATE contra la constraint, sin SELECT previo.
+        self.full_clean(validate_constraints=False)
 
         # Si es la primera imagen y no hay primaria, marcarla como primaria
         if not self.pk and self.variant_id:
             if not ProductImage.objects.filter(variant_id=self.variant_id, is_primary=True).exists():
                 self.is_primary = True
 
-        super().save(*args, **kwargs)
+        # Antes del save: FileField.pre_save marca el archivo como committed.
+        update_fields = kwargs.get("update_fields")
+        image_changed = bool(self.image) and (
+            self._state.adding
+            or not getattr(self.image, "_committed", True)
+            or (update_fields is not None and "image" in update_fields)
+        )
+
+        try:
+            with _savepoint_if_in_atomic_block():
+                super().save(*args, **kwargs)
+        except IntegrityError as exc:
+            if self.is_primary and _is_unique_violation(
+                exc, ProductImage, "uniq_primary_image_per_variant", ("variant",)
+            ):
+                raise ValidationError(
+                    {"is_primary": "Ya existe una imagen marcada como principal para esta variante."}
+                ) from exc
+            raise
 
+        # Guardados solo-metadata (alt_text, sort_order, ...) no tocan el archivo.
+        if not image_changed:
+            return
+
+        # Optimización + warmup después del commit (fuera del save y del read path).
+        transaction.on_commit(self.process_uploaded_image)
+
+    def process_uploaded_image(self) -> None:
+        """Optimiza el original (opcional) y genera los derivados, en ese orden.
+
+        Corre después del commit: desde save() y desde las altas en lote del admin
+        (bulk_create no pasa por save()).
+        """
         # Optimizar imagen original post-save (opcional).
         # Deshabilitado por defecto para no interferir con ImageKit (CACHE) mientras aislamos issues.
         # Para habilitarlo, define en settings:
         #   ENABLE_PRODUCTIMAGE_POSTSAVE_OPTIMIZATION = True
-        if self.image and getattr(settings, "ENABLE_PRODUCTIMAGE_POSTSAVE_OPTIMIZATION", False):
+        if getattr(settings, "ENABLE_PRODUCTIMAGE_POSTSAVE_OPTIMIZATION", False):
             try:
-                from PIL import Image as PILImage
-
-                img = PILImage.open(self.image.path)
-
-                # Convertir RGBA a RGB si es necesario (para JPEG)
-                if img.mode in ("RGBA", "LA", "P"):
-                    rgb_img = PILImage.new("RGB", img.size, (255, 255, 255))
-                    if img.mode == "P":
-                        img = img.convert("RGBA")
-                    rgb_img.paste(
-                        img,
-                        mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None,
-                    )
-                    img = rgb_img
-
-                # Guardar optimizado (solo si es JPEG/PNG)
-                if img.format in ("JPEG", "PNG"):
-                    img.save(self.image.path, optimize=True, quality=85)
+                optimize_original_image(self.image)
             except Exception:
                 # Si falla la optimización, continuar sin error
                 pass
-
+        # Los derivados salen del original ya optimizado.
         warm_imagekit_derivatives(
             self,
             ("image_thumb", "image_medium", "image_large"),
@@ -624,6 +900,27 @@ class ProductImage(models.Model):
     def product(self):
         """Acceso directo al producto desde la imagen (conveniencia)."""
         return self.variant.product if self.variant_id else None
+
+    @classmethod
+    def ensure_primary_for_variants(cls, variant_ids) -> None:
+        """Marca como primaria la primera imagen (por sort_order) de cada variante sin primaria.
+
+        Pensado para escrituras en lote (bulk_create) que no pasan por `save()`.
+        """
+        ids = {int(v) for v in (variant_ids or []) if v}
+        if not ids:
+            return
+
+        # Un solo UPDATE: la primera imagen de cada variante que no tiene primaria.
+        has_primary = cls.objects.filter(variant_id=OuterRef("variant_id"), is_primary=True)
+        first_image = (
+            cls.objects.filter(variant_id=OuterRef("variant_id"))
+            .order_by("sort_order", "created_at", "id")
+            .values("id")[:1]
+        )
+        cls.objects.filter(variant_id__in=ids, id=Subquery(first_image)).filter(
+            ~Exists(has_primary)
+        ).update(is_primary=True)
     
 
     def __str__(self) -> str:
@@ -634,7 +931,7 @@ class ProductImage(models.Model):
 
 
 
-class ProductColorImage(models.Model):
+class ProductColorImage(CdnImageDerivativesMixin, models.Model):
     """Imagen reutilizable por color para un producto.
 
     Fuente principal para categorías apparel SIZE_COLOR, donde la galería
@@ -644,6 +941,7 @@ class ProductColorImage(models.Model):
 
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
     ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+    CDN_TRANSFORMS = PRODUCT_IMAGE_CDN_TRANSFORMS
 
     product = models.ForeignKey(
         Product,
@@ -695,15 +993,15 @@ class ProductColorImage(models.Model):
 
     @property
     def image_thumb_url(self) -> str:
-        return getattr(self.image_thumb, "url", "") if self.image else ""
+        return self.derivative_url("image_thumb")
 
     @property
     def image_medium_url(self) -> str:
-        return getattr(self.image_medium, "url", "") if self.image else ""
+        return self.derivative_url("image_medium")
 
     @property
     def image_large_url(self) -> str:
-        return getattr(self.image_large, "url", "") if self.image else ""
+        return self.derivative_url("image_large")
 
     def clean(self):
         super().clean()
@@ -719,30 +1017,20 @@ class ProductColorImage(models.Model):
             })
 
         if self.product_id and getattr(self.product, "category", None):
-            category_slug = (getattr(self.product.category, "slug", "") or "").strip().lower()
-            category_schema = getattr(self.product.category, "variant_schema", "") or ""
-            rule = resolve_variant_rule(
-                category_slug=category_slug,
-                variant_schema=category_schema,
+            _allowed_values, allowed_colors = get_variant_choices(
+                category_slug=getattr(self.product.category, "slug", ""),
+                variant_schema=getattr(self.product.category, "variant_schema", ""),
             )
-            allowed_colors = rule.get("allowed_colors") or []
             if allowed_colors and self.color not in allowed_colors:
                 raise ValidationError({
                     "color": f"Color inválido para la categoría. Usa: {', '.join(allowed_colors)}."
                 })
 
-        if self.image:
-            if hasattr(self.image, "size") and self.image.size:
-                if self.image.size > self.MAX_FILE_SIZE:
-                    raise ValidationError({
-                        "image": f"El archivo es demasiado grande. Tamaño máximo: {self.MAX_FILE_SIZE / (1024 * 1024):.1f}MB"
-                    })
-
-            ext = os.path.splitext(self.image.name)[1].lower()
-            if ext not in self.ALLOWED_EXTENSIONS:
-                raise ValidationError({
-                    "image": f"Formato no permitido. Formatos permitidos: {', '.join(self.ALLOWED_EXTENSIONS)}"
-                })
+        validate_image_upload(
+            self.image,
+            max_size=self.MAX_FILE_SIZE,
+            allowed_extensions=self.ALLOWED_EXTENSIONS,
+        )
 
         if self.is_primary and self.product_id and self.color:
             existing_primary = ProductColorImage.objects.filter(
@@ -767,12 +1055,20 @@ class ProductColorImage(models.Model):
             if not has_primary:
                 self.is_primary = True
 
+        image_changed = bool(self.image) and (
+            self._state.adding or not getattr(self.image, "_committed", True)
+        )
+
         result = super().save(*args, **kwargs)
 
-        warm_imagekit_derivatives(
-            self,
-            ("image_thumb", "image_medium", "image_large"),
-        )
+        # Warmup después del commit y solo si llegó un archivo nuevo.
+        if image_changed:
+            transaction.on_commit(
+                lambda: warm_imagekit_derivatives(
+                    self,
+                    ("image_thumb", "image_medium", "image_large"),
+                )
+            )
 
         return result
 
@@ -783,6 +1079,39 @@ class ProductColorImage(models.Model):
 
 
 
+def _canonical_variant_value(value) -> str:
+    return normalize_variant_value(value) or ""
+
+
+def _canonical_variant_color(color) -> str:
+    return normalize_variant_color(color) or ""
+
+
+class NormalizedCharField(models.CharField):
+    """CharField que persiste siempre la forma canónica del valor.
+
+    Normaliza en `pre_save` (una vez por save), sin tocar la asignación del
+    atributo: las filas leídas de la BD conservan su valor real, así los
+    reparadores (variant_sync) pueden detectar datos no canónicos.
+    """
+
+    def __init__(self, *args, normalizer=None, **kwargs):
+        self.normalizer = normalizer or (lambda value: value)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        raw = getattr(model_instance, self.attname)
+        value = self.normalizer(raw)
+        if value != raw:
+            setattr(model_instance, self.attname, value)
+        return value
+
+    def deconstruct(self):
+        name, _path, args, kwargs = super().deconstruct()
+        # Solo runtime: para migraciones sigue siendo un CharField normal.
+        return name, "django.db.models.CharField", args, kwargs
+
+
 class ProductVariant(models.Model):
     """Variante comprable de un producto (combinación de atributos).
 
@@ -793,9 +1122,13 @@ class ProductVariant(models.Model):
 
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="variants")
 
-    # Atributos flexibles
-    value = models.CharField(max_length=32, blank=True, default="")  # talla/numero/medida
-    color = models.CharField(max_length=32, blank=True, default="")
+    # Atributos flexibles (normalizados al guardar: value upper, color capitalizado)
+    value = NormalizedCharField(
+        max_length=32, blank=True, default="", normalizer=_canonical_variant_value
+    )  # talla/numero/medida
+    color = NormalizedCharField(
+        max_length=32, blank=True, default="", normalizer=_canonical_variant_color
+    )
 
     # LEGACY: mantenido para compatibilidad con admin y vistas actuales.
     # NO usar como fuente de verdad para descontar en checkout.
@@ -810,8 +1143,17 @@ class ProductVariant(models.Model):
                 name="uniq_product_variant_value_color",
             ),
         ]
+        indexes = [
+            # variants.filter(is_active=True) por producto (listados, stock, PDP).
+            models.Index(fields=["product", "is_active"], name="pv_product_active_idx"),
+        ]
         ordering = ["product__name", "value", "id"]
 
+    # Schemas de solo talla (sin color).
+    _SIZE_ONLY_SCHEMAS = frozenset(
+        (Category.VariantSchema.JEAN_SIZE, Category.VariantSchema.SHOE_SIZE)
+    )
+
     def _schema(self) -> str:
         if not self.product_id or not getattr(self.product, "category", None):
             return Category.VariantSchema.SIZE_COLOR
@@ -822,59 +1164,58 @@ class ProductVariant(models.Model):
 
         schema = self._schema()
 
-        normalized_value = normalize_variant_value(self.value) or ""
-        normalized_color = normalize_variant_color(self.color) or ""
+        # Forma canónica para validar contra las reglas; pre_save cubre los saves sin clean().
+        self.value = _canonical_variant_value(self.value)
+        self.color = _canonical_variant_color(self.color)
 
         if schema == Category.VariantSchema.NO_VARIANT:
             self.value = ""
             self.color = ""
             return
 
-        if not normalized_value:
+        if not self.value:
             raise ValidationError({"value": "Selecciona un valor de variante (talla/número)."})
 
         if schema == Category.VariantSchema.SIZE_COLOR:
-            if not normalized_color:
+            if not self.color:
                 raise ValidationError({"color": "Selecciona un color."})
-            self.value = normalized_value
-            self.color = normalized_color
-
-            category_slug = (getattr(self.product.category, "slug", "") or "").strip().lower()
-            category_schema = getattr(self.product.category, "variant_schema", "") or ""
-            rule = resolve_variant_rule(
-                category_slug=category_slug,
-                variant_schema=category_schema,
+
+            allowed_sizes, allowed_colors = get_variant_choices(
+                category_slug=getattr(self.product.category, "slug", ""),
+                variant_schema=getattr(self.product.category, "variant_schema", ""),
             )
-            allowed_sizes = rule.get("allowed_values") or []
             if allowed_sizes and self.value not in allowed_sizes:
                 raise ValidationError({"value": f"Valor inválido. Usa: {', '.join(allowed_sizes)}."})
-            allowed_colors = rule.get("allowed_colors") or []
             if allowed_colors and self.color not in allowed_colors:
                 raise ValidationError({"color": f"Color inválido. Usa: {', '.join(allowed_colors)}."})
 
-        elif schema == Category.VariantSchema.JEAN_SIZE:
-            self.value = normalized_value
-            self.color = ""
-
-        elif schema == Category.VariantSchema.SHOE_SIZE:
-            self.value = normalized_value
+        elif schema in self._SIZE_ONLY_SCHEMAS:
             self.color = ""
 
         else:
             raise ValidationError({"product": "Esquema de variante no soportado para este producto."})
 
-        if self.product_id:
-            exists = (
-                type(self).objects
-                .filter(product_id=self.product_id, value=self.value, color=self.color)
-                .exclude(pk=self.pk)
-                .exists()
-            )
-            if exists:
+        # Duplicados (product, value, color): los valida la constraint
+        # uniq_product_variant_value_color (full_clean/ModelForm) y, en saves
+        # directos, el IntegrityError se traduce en save().
+
+    def save(self, *args, **kwargs):
+        try:
+            with _savepoint_if_in_atomic_block():
+                super().save(*args, **kwargs)
+        except IntegrityError as exc:
+            # create()/get_or_create() (force_insert) manejan la carrera con el
+            # IntegrityError original; no traducirlo ahí.
+            if kwargs.get("force_insert"):
+                raise
+            if _is_unique_violation(
+                exc, ProductVariant, "uniq_product_variant_value_color", ("product", "value", "color")
+            ):
                 raise ValidationError({
                     "value": "Ya existe una variante con este valor para este producto.",
                     "color": "Ya existe una variante con este valor/color para este producto.",
-                })
+                }) from exc
+            raise
 
     def __str__(self) -> str:
         schema = self._schema()
@@ -885,7 +1226,7 @@ class ProductVariant(models.Model):
 
 
 
-class HomepageBanner(models.Model):
+class HomepageBanner(CdnImageDerivativesMixin, models.Model):
     """Hero banners para la página principal (administrables desde el admin).
 
     Pensados para un carrusel horizontal tipo Skeleton.
@@ -901,6 +1242,7 @@ class HomepageBanner(models.Model):
     )
 
     image = models.ImageField(upload_to=homepage_banner_upload_path)
+    CDN_TRANSFORMS = {**HOMEPAGE_IMAGE_CDN_TRANSFORMS, "image_hero": _cdn_transform(1400, 75)}
 
     # Derivados optimizados (WebP) para servir en frontend sin usar el original.
     image_thumb = ImageSpecField(
@@ -931,19 +1273,19 @@ class HomepageBanner(models.Model):
 
     @property
     def image_hero_url(self) -> str:
-        return getattr(self.image_hero, 'url', '') if self.image else ''
+        return self.derivative_url("image_hero")
 
     @property
     def image_thumb_url(self) -> str:
-        return getattr(self.image_thumb, 'url', '') if self.image else ''
+        return self.derivative_url("image_thumb")
 
     @property
     def image_medium_url(self) -> str:
-        return getattr(self.image_medium, 'url', '') if self.image else ''
+        return self.derivative_url("image_medium")
 
     @property
     def image_large_url(self) -> str:
-        return getattr(self.image_large, 'url', '') if self.image else ''
+        return self.derivative_url("image_large")
     alt_text = models.CharField(max_length=200, blank=True, default="")
 
     cta_label = models.CharField(
@@ -1016,7 +1358,7 @@ class HomepageBanner(models.Model):
         return self.title
 
 
-class HomepagePromo(models.Model):
+class HomepagePromo(CdnImageDerivativesMixin, models.Model):
     """Promos/cards para el Home (ej: identidad de marca, materiales, galería).
 
     Similar a HomepageBanner, pero pensado como tarjetas en una grilla o carrusel.
@@ -1043,6 +1385,7 @@ class HomepagePromo(models.Model):
     )
 
     image = models.ImageField(upload_to=homepage_promo_upload_path)
+    CDN_TRANSFORMS = {**HOMEPAGE_IMAGE_CDN_TRANSFORMS, "image_card": _cdn_transform(1000, 75)}
 
     # Derivados optimizados (WebP) para servir en frontend sin usar el original.
     image_thumb = ImageSpecField(
@@ -1073,19 +1416,19 @@ class HomepagePromo(models.Model):
 
     @property
     def image_card_url(self) -> str:
-        return getattr(self.image_card, 'url', '') if self.image else ''
+        return self.derivative_url("image_card")
 
     @property
     def image_thumb_url(self) -> str:
-        return getattr(self.image_thumb, 'url', '') if self.image else ''
+        return self.derivative_url("image_thumb")
 
     @property
     def image_medium_url(self) -> str:
-        return getattr(self.image_medium, 'url', '') if self.image else ''
+        return self.derivative_url("image_medium")
 
     @property
     def image_large_url(self) -> str:
-        return getattr(self.image_large, 'url', '') if self.image else ''
+        return self.derivative_url("image_large")
     alt_text = models.CharField(max_length=200, blank=True, default="")
 
     cta_label = models.CharField(
@@ -1138,6 +1481,15 @@ class HomepagePromo(models.Model):
         ordering = ["sort_order", "id"]
         verbose_name = "Promo de Home"
         verbose_name_plural = "Promos de Home"
+        indexes = [
+            # /homepage-promos/?placement=TOP|MID: igualdad por placement + orden
+            # sort_order, id sobre promos activas, resuelto por el índice.
+            models.Index(
+                fields=["placement", "sort_order", "id"],
+                condition=models.Q(is_active=True),
+                name="promo_active_placement_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title or f"Promo #{self.pk or 'nuevo'}"
@@ -1196,6 +1548,14 @@ class HomepageSection(models.Model):
         ordering = ["sort_order", "-updated_at", "id"]
         verbose_name = "Sección de Home"
         verbose_name_plural = "Secciones de Home"
+        indexes = [
+            # Story del home (/homepage-story/ y /homepage/): activas por sort_order, id.
+            models.Index(
+                fields=["sort_order", "id"],
+                condition=models.Q(is_active=True),
+                name="homesection_active_order_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         k = (self.key or "").strip()
@@ -4,10 +4,14 @@ Incluyen imágenes con URL absoluta y orden primary + gallery.
 """
 
 import logging
+
 from rest_framework import serializers
 
 from django.conf import settings
-from django.db.models import Exists, OuterRef
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.db import models
+from django.db.models import Exists, OuterRef, Prefetch, Subquery, prefetch_related_objects
 logger = logging.getLogger(__name__)
 
 
@@ -24,10 +28,29 @@ from .models import (
     ProductVariant,
 )
 
-from .services.inventory import get_pool_map, get_variant_available_stock
+from .services.inventory import effective_stock, get_pool_map, get_variant_available_stock
 from .variant_rules import sort_variant_values
 
 
+# R2_PUBLIC_BASE_URL sin slash final; se lee de settings una vez (ver reset abajo).
+_R2_PUBLIC_BASE = None
+
+
+def _r2_public_base() -> str:
+    global _R2_PUBLIC_BASE
+    if _R2_PUBLIC_BASE is None:
+        _R2_PUBLIC_BASE = (getattr(settings, "R2_PUBLIC_BASE_URL", "") or "").rstrip("/")
+    return _R2_PUBLIC_BASE
+
+
+@receiver(setting_changed)
+def _reset_r2_public_base(*, setting, **kwargs):
+    # override_settings en tests.
+    global _R2_PUBLIC_BASE
+    if setting == "R2_PUBLIC_BASE_URL":
+        _R2_PUBLIC_BASE = None
+
+
 def public_media_url(value, request=None):
     """Construye una URL pública absoluta para cualquier ImageField/path.
 
@@ -40,11 +63,16 @@ def public_media_url(value, request=None):
     if not value:
         return None
 
-    # ImageField / FieldFile
-    try:
-        url = value.url
-    except Exception:
-        url = str(value)
+    # Camino caliente: los specs ya llegan como str. Evita el `.url` que en un
+    # str levanta AttributeError (una excepción por URL construida).
+    if isinstance(value, str):
+        url = value
+    else:
+        # ImageField / FieldFile
+        try:
+            url = value.url
+        except Exception:
+            url = str(value)
 
     if not url:
         return None
@@ -52,14 +80,19 @@ def public_media_url(value, request=None):
     if url.startswith("http://") or url.startswith("https://"):
         return url
 
-    base = (getattr(settings, "R2_PUBLIC_BASE_URL", "") or "").rstrip("/")
+    base = _r2_public_base()
 
     if base:
-        if not url.startswith("/"):
-            url = f"/{url}"
-        return f"{base}{url}"
+        # `base` viene sin "/" final: una sola concatenación, sin ramas.
+        return f"{base}/{url.lstrip('/')}"
 
     if request is not None:
+        # Paths absolutos (/media/...): scheme+host se resuelve una vez por request
+        # en vez de re-leer META en cada build_absolute_uri().
+        if url.startswith("/"):
+            prefix = _request_host_prefix(request)
+            if prefix:
+                return f"{prefix}{url}"
         try:
             return request.build_absolute_uri(url)
         except Exception:
@@ -68,20 +101,73 @@ def public_media_url(value, request=None):
     return url
 
 
+def _request_host_prefix(request):
+    """`scheme://host` del request, memoizado en el propio request ("" si falla)."""
+    prefix = getattr(request, "_abs_uri_prefix", None)
+    if prefix is None:
+        try:
+            prefix = f"{request.scheme}://{request.get_host()}"
+        except Exception:
+            prefix = ""
+        try:
+            request._abs_uri_prefix = prefix
+        except Exception:
+            pass
+    return prefix
+
+
 def _absolute_uri(request, url):
     # Compat wrapper
     return public_media_url(url, request=request)
 
 
-def _spec_url(obj, spec_attr: str):
+def _request_spec_url_cache(request):
+    """Dict por request para URLs de specs (None si no hay request)."""
+    if request is None:
+        return None
+    cache = getattr(request, "_spec_url_cache", None)
+    if cache is None:
+        cache = {}
+        try:
+            setattr(request, "_spec_url_cache", cache)
+        except Exception:
+            return None
+    return cache
+
+
+# {clase de modelo: frozenset(specs ImageKit declarados)}; se calcula una vez por clase.
+_MODEL_SPEC_ATTRS = {}
+_KNOWN_SPEC_ATTRS = ("image_thumb", "image_medium", "image_large", "image_hero", "image_card")
+
+
+def _model_spec_attrs(model_cls) -> frozenset:
+    attrs = _MODEL_SPEC_ATTRS.get(model_cls)
+    if attrs is None:
+        attrs = frozenset(
+            name for name in _KNOWN_SPEC_ATTRS if getattr(model_cls, name, None) is not None
+        )
+        _MODEL_SPEC_ATTRS[model_cls] = attrs
+    return attrs
+
+
+def _spec_url(obj, spec_attr: str, request=None):
     """Retorna URL del spec usando cache memoizado y acceso directo al derivado.
 
     Política:
-    - No verificar `storage.exists()` en serialización.
+    - No verificar `storage.exists()` en serialización (salvo
+      CATALOG_VERIFY_CACHEFILE_EXISTS, pensado para staging).
     - No reenvolver specs con ImageCacheFile dentro del serializer.
     - Memoizar por objeto/spec para evitar trabajo repetido dentro del mismo ciclo.
+    - Con `request`, memoizar además por (modelo, archivo fuente, spec) durante el
+      request: la misma imagen cargada en varias instancias (listado, primaria,
+      galería) resuelve su cachefile una sola vez.
+    - Con CDN de imágenes (IMAGEKIT_ENDPOINT) la URL se arma sin tocar ImageKit.
+    - Specs que el modelo no declara -> None sin tocar la instancia ni ImageKit.
     - Si algo falla, retornar None para fallback limpio.
     """
+    if spec_attr not in _model_spec_attrs(type(obj)):
+        return None
+
     try:
         cache = getattr(obj, "_resolved_spec_url_cache", None)
         if cache is None:
@@ -91,15 +177,41 @@ def _spec_url(obj, spec_attr: str):
         if spec_attr in cache:
             return cache[spec_attr]
 
+        shared = _request_spec_url_cache(request)
+        source_name = getattr(getattr(obj, "image", None), "name", None)
+        shared_key = (obj.__class__.__name__, source_name, spec_attr) if source_name else None
+        if shared is not None and shared_key is not None and shared_key in shared:
+            cache[spec_attr] = shared[shared_key]
+            return cache[spec_attr]
+
+        url = _resolve_spec_url(obj, spec_attr)
+        cache[spec_attr] = url
+        if shared is not None and shared_key is not None:
+            shared[shared_key] = url
+        return url
+    except Exception:
+        return None
+
+
+def _resolve_spec_url(obj, spec_attr: str):
+    """Resuelve la URL de un spec (CDN o ImageKit) sin cache."""
+    try:
+        cdn_resolver = getattr(obj, "cdn_derivative_url", None)
+        if cdn_resolver is not None:
+            cdn_url = cdn_resolver(spec_attr)
+            if cdn_url:
+                return cdn_url
+
         spec = getattr(obj, spec_attr, None)
         if not spec:
-            cache[spec_attr] = None
             return None
 
         try:
-            url = getattr(spec, "url", None)
-            cache[spec_attr] = url or None
-            return cache[spec_attr]
+            # Por defecto se confía en la generación al subir (sin HEAD a storage).
+            if getattr(settings, "CATALOG_VERIFY_CACHEFILE_EXISTS", False):
+                if not spec.storage.exists(spec.name):
+                    return None
+            return getattr(spec, "url", None) or None
         except Exception as exc:
             logger.warning(
                 "Failed resolving ImageKit spec",
@@ -110,7 +222,6 @@ def _spec_url(obj, spec_attr: str):
                     "error": str(exc),
                 },
             )
-            cache[spec_attr] = None
             return None
     except Exception:
         return None
@@ -135,7 +246,7 @@ def _resolve_public_image_urls(obj, request=None, primary_specs=None):
 
     spec_priority = tuple(primary_specs or ("image_large", "image_medium", "image_thumb"))
     needed_specs = tuple(dict.fromkeys((*spec_priority, "image_thumb", "image_medium", "image_large")))
-    resolved_specs = {spec_attr: _spec_url(obj, spec_attr) for spec_attr in needed_specs}
+    resolved_specs = {spec_attr: _spec_url(obj, spec_attr, request=request) for spec_attr in needed_specs}
 
     primary_public = next((resolved_specs.get(spec_attr) for spec_attr in spec_priority if resolved_specs.get(spec_attr)), None)
     original_public = public_media_url(obj.image.url, request=request)
@@ -167,9 +278,9 @@ def _resolve_listing_image_urls(image_obj, request=None):
             "primary_image": None,
         }
 
-    thumb = public_media_url(_spec_url(image_obj, "image_thumb"), request=request)
-    medium = public_media_url(_spec_url(image_obj, "image_medium"), request=request)
-    large = public_media_url(_spec_url(image_obj, "image_large"), request=request)
+    thumb = public_media_url(_spec_url(image_obj, "image_thumb", request=request), request=request)
+    medium = public_media_url(_spec_url(image_obj, "image_medium", request=request), request=request)
+    large = public_media_url(_spec_url(image_obj, "image_large", request=request), request=request)
     original = public_media_url(image_obj.image.url, request=request)
 
     return {
@@ -184,6 +295,72 @@ def _resolve_listing_image_urls(image_obj, request=None):
 
 
 
+class ResolvedImageUrlsMixin:
+    """Resuelve las 4 URLs públicas de una imagen una sola vez por objeto.
+
+    Los campos `image`, `image_thumb_url`, `image_medium_url` e `image_large_url`
+    leen del mismo dict, memoizado en la instancia (`obj._public_image_urls`),
+    en vez de un método por campo. `primary_specs` define la prioridad del campo
+    `image` (ver `_resolve_public_image_urls`).
+    """
+
+    primary_specs = None
+
+    def _get_resolved_urls(self, obj):
+        resolved = obj.__dict__.get("_public_image_urls")
+        if resolved is None:
+            resolved = _resolve_public_image_urls(
+                obj,
+                request=self.context.get("request"),
+                primary_specs=self.primary_specs,
+            )
+            obj._public_image_urls = resolved
+        return resolved
+
+    def _flat_row(self, obj, field_names):
+        urls = self._get_resolved_urls(obj)
+        return {
+            name: urls[name] if name in urls else getattr(obj, name)
+            for name in field_names
+        }
+
+    def to_representation(self, instance):
+        # Una sola pasada: URLs resueltas + atributos planos, sin despachar un
+        # `to_representation` por campo (mismo contrato que la versión lista).
+        return self._flat_row(instance, self.Meta.fields)
+
+
+class ResolvedImageListSerializer(serializers.ListSerializer):
+    """ListSerializer de una sola pasada para serializers de imagen.
+
+    Estilo `get_attrs`: por cada imagen resuelve sus URLs una vez y arma la fila
+    directo desde `Meta.fields` (URLs resueltas o atributo plano del modelo), sin
+    despachar un `to_representation` por campo. Solo para serializers cuyos
+    campos no-URL son escalares (ids, strings, bools, ints).
+    """
+
+    def to_representation(self, data):
+        items = data.all() if isinstance(data, models.manager.BaseManager) else data
+        child = self.child
+        field_names = tuple(child.Meta.fields)
+
+        flat_row = child._flat_row
+        return [flat_row(item, field_names) for item in items]
+
+
+class ResolvedImageUrlField(serializers.Field):
+    """Campo read-only que expone una clave de `ResolvedImageUrlsMixin._get_resolved_urls`."""
+
+    def __init__(self, key, **kwargs):
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+        self.key = key
+
+    def to_representation(self, obj):
+        return self.parent._get_resolved_urls(obj)[self.key]
+
+
 # --- POOL MAP CACHE HELPER ---
 def _pool_map_cached(category_id: int, ctx: dict) -> dict:
     """Cache get_pool_map per-category inside serializer context."""
@@ -196,7 +373,7 @@ def _pool_map_cached(category_id: int, ctx: dict) -> dict:
     return cache[cid]
 
 
-def _effective_inventory_from_pool(category_id: int, variants_qs_or_list):
+def _effective_inventory_from_pool(category_id: int, variants_qs_or_list, pool_map=None):
     """Fuente de verdad de inventario efectivo desde InventoryPool.
 
     Contrato:
@@ -204,37 +381,22 @@ def _effective_inventory_from_pool(category_id: int, variants_qs_or_list):
     - sold_out: boolean real
     - stock_total: NO sumar (puede inflar).
       Usamos: max(stock_variants) o 0.
+    - `pool_map` opcional: si el caller ya lo tiene, no se consulta la DB.
 
     Retorna:
     - stock_total (int)
     - sold_out (bool)
     - pool_map (dict)
     """
-    pool_map = _pool_map_cached(category_id, {}) if variants_qs_or_list is None else None
-    # Prefer using serializer context cache when possible (caller can pass ctx via setattr)
-    ctx = getattr(variants_qs_or_list, "_serializer_ctx", None) if hasattr(variants_qs_or_list, "__class__") else None
-    if isinstance(ctx, dict):
-        pool_map = _pool_map_cached(category_id, ctx)
+    if pool_map is None:
+        # Prefer using serializer context cache when possible (caller can pass ctx via setattr)
+        ctx = getattr(variants_qs_or_list, "_serializer_ctx", None)
+        if isinstance(ctx, dict):
+            pool_map = _pool_map_cached(category_id, ctx)
     if pool_map is None:
         pool_map = get_pool_map(int(category_id or 0))
 
-    max_stock = 0
-    for v in variants_qs_or_list:
-        try:
-            is_active = bool(getattr(v, "is_active", False))
-        except Exception:
-            is_active = False
-        if not is_active:
-            continue
-
-        try:
-            available = int(get_variant_available_stock(v, pool_map=pool_map) or 0)
-        except Exception:
-            available = 0
-
-        if available > max_stock:
-            max_stock = available
-
+    max_stock = effective_stock(category_id, variants_qs_or_list, pool_map=pool_map)
     sold_out = max_stock <= 0
     return max_stock, sold_out, pool_map
 
@@ -365,14 +527,15 @@ class NavDepartmentSerializer(serializers.ModelSerializer):
 # Product image (URL absoluta, orden: is_primary primero, luego sort_order)
 # ---------------------------------------------------------------------------
 
-class ProductImageSerializer(serializers.ModelSerializer):
-    image = serializers.SerializerMethodField()
-    image_thumb_url = serializers.SerializerMethodField()
-    image_medium_url = serializers.SerializerMethodField()
-    image_large_url = serializers.SerializerMethodField()
+class ProductImageSerializer(ResolvedImageUrlsMixin, serializers.ModelSerializer):
+    image = ResolvedImageUrlField("image")
+    image_thumb_url = ResolvedImageUrlField("image_thumb_url")
+    image_medium_url = ResolvedImageUrlField("image_medium_url")
+    image_large_url = ResolvedImageUrlField("image_large_url")
 
     class Meta:
         model = ProductImage
+        list_serializer_class = ResolvedImageListSerializer
         fields = [
             "id",
             "image",
@@ -384,39 +547,17 @@ class ProductImageSerializer(serializers.ModelSerializer):
             "sort_order",
         ]
 
-    def _get_resolved_urls(self, obj):
-        cache = self.context.setdefault("_resolved_image_urls", {})
-        key = (self.__class__.__name__, getattr(obj, "id", None))
-        if key in cache:
-            return cache[key]
-
-        resolved = _resolve_public_image_urls(obj, request=self.context.get("request"))
-        cache[key] = resolved
-        return resolved
-
-    def get_image(self, obj):
-        return self._get_resolved_urls(obj)["image"]
-
-    def get_image_thumb_url(self, obj):
-        return self._get_resolved_urls(obj)["image_thumb_url"]
-
-    def get_image_medium_url(self, obj):
-        return self._get_resolved_urls(obj)["image_medium_url"]
 
-    def get_image_large_url(self, obj):
-        return self._get_resolved_urls(obj)["image_large_url"]
-
-
-
-class ProductColorImageSerializer(serializers.ModelSerializer):
+class ProductColorImageSerializer(ResolvedImageUrlsMixin, serializers.ModelSerializer):
     color = serializers.CharField(read_only=True)
-    image = serializers.SerializerMethodField()
-    image_thumb_url = serializers.SerializerMethodField()
-    image_medium_url = serializers.SerializerMethodField()
-    image_large_url = serializers.SerializerMethodField()
+    image = ResolvedImageUrlField("image")
+    image_thumb_url = ResolvedImageUrlField("image_thumb_url")
+    image_medium_url = ResolvedImageUrlField("image_medium_url")
+    image_large_url = ResolvedImageUrlField("image_large_url")
 
     class Meta:
         model = ProductColorImage
+        list_serializer_class = ResolvedImageListSerializer
         fields = [
             "id",
             "color",
@@ -429,27 +570,182 @@ class ProductColorImageSerializer(serializers.ModelSerializer):
             "sort_order",
         ]
 
-    def _get_resolved_urls(self, obj):
-        cache = self.context.setdefault("_resolved_image_urls", {})
-        key = (self.__class__.__name__, getattr(obj, "id", None))
-        if key in cache:
-            return cache[key]
 
-        resolved = _resolve_public_image_urls(obj, request=self.context.get("request"))
-        cache[key] = resolved
-        return resolved
+# ---------------------------------------------------------------------------
+# Límites de materialización (catálogos desbordados no deben cargar todo en memoria)
+# ---------------------------------------------------------------------------
+MAX_VARIANTS_PER_PRODUCT = 200
+MAX_IMAGES_PER_VARIANT = 20
+MAX_COLOR_IMAGES_PER_PRODUCT = 100
 
-    def get_image(self, obj):
-        return self._get_resolved_urls(obj)["image"]
 
-    def get_image_thumb_url(self, obj):
-        return self._get_resolved_urls(obj)["image_thumb_url"]
+# ---------------------------------------------------------------------------
+# Orden de galerías (primaria primero); compartido por serializers y views
+# ---------------------------------------------------------------------------
+IMAGE_ORDER = ("-is_primary", "sort_order", "created_at", "id")
+
+
+def ordered_images_prefetch(limit=MAX_IMAGES_PER_VARIANT):
+    """Prefetch de `variant.images` ordenado por IMAGE_ORDER en `ordered_images`.
+
+    Es una factory y no una constante: Django muta los `Prefetch` anidados
+    (add_prefix) al resolverlos, así que cada queryset recibe su propia instancia.
+    """
+    queryset = ProductImage.objects.order_by(*IMAGE_ORDER)
+    if limit:
+        queryset = queryset[:limit]
+    return Prefetch("images", queryset=queryset, to_attr="ordered_images")
+
+
+# ---------------------------------------------------------------------------
+# Helper: variantes activas desde prefetch
+# ---------------------------------------------------------------------------
+def _prefetched_active_variants(product):
+    """Variantes activas desde el prefetch de `variants` (None si no hay prefetch)."""
+    cache = getattr(product, "_prefetched_objects_cache", None) or {}
+    if "variants" not in cache:
+        return None
+    return [v for v in cache["variants"] if v.is_active]
+
+
+def _active_variants(product):
+    prefetched = _prefetched_active_variants(product)
+    if prefetched is not None:
+        return prefetched
+    return list(product.variants.filter(is_active=True)[:MAX_VARIANTS_PER_PRODUCT])
+
+
+# ---------------------------------------------------------------------------
+# Helper: imagen primaria de cards vía subquery (1 fila por producto)
+# ---------------------------------------------------------------------------
+def primary_list_image_annotations():
+    """Anotaciones `primary_image_id` / `primary_color_image_id` para listados.
+
+    Subqueries correlacionadas: la DB ordena y devuelve un solo id por producto,
+    en vez de prefetch de todas las imágenes y elegir en Python.
+    - ProductImage: variantes activas primero (luego inactivas, como el fallback DB).
+    - ProductColorImage: por producto (solo se usa en SIZE_COLOR).
+    """
+    image_sq = (
+        ProductImage.objects.filter(variant__product=OuterRef("pk"))
+        .exclude(image="")
+        .order_by("-variant__is_active", *IMAGE_ORDER)
+        .values("id")[:1]
+    )
+    color_sq = ProductColorImage.objects.filter(product=OuterRef("pk")).exclude(image="")
+    if hasattr(ProductColorImage, "is_active"):
+        color_sq = color_sq.filter(is_active=True)
+    color_sq = color_sq.order_by(*IMAGE_ORDER).values("id")[:1]
+
+    return {
+        "primary_image_id": Subquery(image_sq),
+        "primary_color_image_id": Subquery(color_sq),
+    }
+
+
+def attach_primary_list_images(products) -> None:
+    """Carga en 2 queries las imágenes anotadas y las asigna a `primary_list_image`.
+
+    Requiere productos anotados con `primary_list_image_annotations()`.
+    """
+    products = list(products)
+    image_ids = {p.primary_image_id for p in products if p.primary_image_id}
+    color_ids = {p.primary_color_image_id for p in products if p.primary_color_image_id}
+    # Las cards solo leen `image` (nombre en storage -> specs/CDN); el resto de
+    # columnas no viaja.
+    images = ProductImage.objects.only("id", "image").in_bulk(image_ids) if image_ids else {}
+    color_images = (
+        ProductColorImage.objects.only("id", "image").in_bulk(color_ids) if color_ids else {}
+    )
+
+    for product in products:
+        image = None
+        schema = getattr(getattr(product, "category", None), "variant_schema", "")
+        if schema == Category.VariantSchema.SIZE_COLOR:
+            image = color_images.get(product.primary_color_image_id)
+        if image is None:
+            image = images.get(product.primary_image_id)
+        product.primary_list_image = image
+
+
+def _image_sort_key(image):
+    return (
+        0 if bool(getattr(image, "is_primary", False)) else 1,
+        int(getattr(image, "sort_order", 0) or 0),
+        getattr(image, "created_at", None),
+        int(getattr(image, "id", 0) or 0),
+    )
+
+
+_NO_PRIMARY_IMAGE = object()
+
 
-    def get_image_medium_url(self, obj):
-        return self._get_resolved_urls(obj)["image_medium_url"]
+def _resolve_primary_image(product):
+    """Imagen primaria del producto, única implementación para listado y PDP.
 
-    def get_image_large_url(self, obj):
-        return self._get_resolved_urls(obj)["image_large_url"]
+    Prioridad:
+    0) `primary_list_image` asignada por `attach_primary_list_images` (listados).
+    1) SIZE_COLOR -> `prefetched_color_images` priorizando primaria
+       (o una query ordenada si no hay prefetch).
+    2) variantes activas prefetched + `ordered_images`: primera imagen válida de
+       cada variante, y la mejor entre ellas.
+    3) fallback DB: ProductImage del producto (variantes activas primero).
+
+    Se memoiza en el producto: primary_image / thumb / medium no repiten trabajo.
+    """
+    if "primary_list_image" in product.__dict__:
+        return product.primary_list_image
+
+    cached = product.__dict__.get("_resolved_primary_image")
+    if cached is not None:
+        return None if cached is _NO_PRIMARY_IMAGE else cached
+
+    image = _find_primary_image(product)
+    product._resolved_primary_image = _NO_PRIMARY_IMAGE if image is None else image
+    return image
+
+
+def _find_primary_image(product):
+    schema = getattr(getattr(product, "category", None), "variant_schema", "")
+
+    if schema == Category.VariantSchema.SIZE_COLOR:
+        prefetched = getattr(product, "prefetched_color_images", None)
+        if prefetched is not None:
+            color_images = [image for image in prefetched if getattr(image, "image", None)]
+            if color_images:
+                return min(color_images, key=_image_sort_key)
+        else:
+            color_img = (
+                ProductColorImage.objects.filter(product=product)
+                .exclude(image="")
+                .order_by(*IMAGE_ORDER)
+                .first()
+            )
+            if color_img is not None:
+                return color_img
+
+    variants = _prefetched_active_variants(product)
+    if variants is not None:
+        # `ordered_images` ya viene ordenado (primaria primero): basta con
+        # la primera imagen válida de cada variante.
+        candidate_images = []
+        for variant in variants:
+            first = next(
+                (image for image in getattr(variant, "ordered_images", None) or [] if image.image),
+                None,
+            )
+            if first is not None:
+                candidate_images.append(first)
+
+        if candidate_images:
+            return min(candidate_images, key=_image_sort_key)
+
+    return (
+        ProductImage.objects.filter(variant__product=product)
+        .exclude(image="")
+        .order_by("-variant__is_active", *IMAGE_ORDER)
+        .first()
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -480,7 +776,9 @@ def _resolve_variant_gallery_images(variant):
 
     Reglas:
     - SIZE_COLOR: usar ProductColorImage por product + color.
-    - Preferir imágenes prefetched en memoria para evitar N+1.
+    - Preferir imágenes prefetched en memoria para evitar N+1
+      (`variant.ordered_images` viene del Prefetch con to_attr de la vista;
+      sin prefetch de color se carga una sola vez por producto).
     - Fallback: ProductImage legacy por variante si no hay imágenes por color.
     - Otros schemas: mantener ProductImage legacy por variante.
     """
@@ -491,22 +789,26 @@ def _resolve_variant_gallery_images(variant):
     if schema == Category.VariantSchema.SIZE_COLOR and product is not None:
         color = getattr(variant, "color", "") or ""
         color_index = _build_prefetched_color_images_index(product)
-        if color_index is not None:
-            color_images = color_index.get(color) or []
-            if color_images:
-                return color_images, "color"
+        if color_index is None:
+            # Sin prefetch: cargar la galería por color del producto UNA vez y
+            # dejarla como si viniera prefetched, para que las demás variantes
+            # del mismo producto (S/M/L del mismo color) no repitan la query.
+            product.prefetched_color_images = list(
+                ProductColorImage.objects.filter(product=product)
+                .order_by(*IMAGE_ORDER)[:MAX_COLOR_IMAGES_PER_PRODUCT]
+            )
+            color_index = _build_prefetched_color_images_index(product)
 
-        color_images = list(
-            ProductColorImage.objects.filter(
-                product=product,
-                color=color,
-            ).order_by("-is_primary", "sort_order", "created_at")
-        )
+        color_images = color_index.get(color) or []
         if color_images:
             return color_images, "color"
 
+    ordered_images = getattr(variant, "ordered_images", None)
+    if ordered_images is not None:
+        return list(ordered_images), "legacy"
+
     legacy_images = list(
-        variant.images.all().order_by("-is_primary", "sort_order", "created_at")
+        variant.images.all().order_by(*IMAGE_ORDER)[:MAX_IMAGES_PER_VARIANT]
     )
     return legacy_images, "legacy"
 
@@ -554,32 +856,50 @@ class ProductVariantSerializer(serializers.ModelSerializer):
         except Exception:
             return 0
 
+    def _image_serializer(self, source):
+        """Serializer de imagen por tipo de galería, creado una vez y reusado
+        para todas las variantes (en many=True este serializer es el child único)."""
+        cache = self.__dict__.setdefault("_image_serializers", {})
+        child = cache.get(source)
+        if child is None:
+            serializer_class = ProductColorImageSerializer if source == "color" else ProductImageSerializer
+            child = serializer_class(context=self.context)
+            cache[source] = child
+        return child
+
     def get_images(self, obj):
-        qs, source = self._get_variant_gallery_cache(obj)
-        serializer_class = ProductColorImageSerializer if source == "color" else ProductImageSerializer
-        return serializer_class(qs, many=True, context=self.context).data
+        images, source = self._get_variant_gallery_cache(obj)
+        child = self._image_serializer(source)
+        field_names = tuple(child.Meta.fields)
+        return [child._flat_row(image, field_names) for image in images]
 
-    def get_image_url(self, obj):
+    def _first_image(self, obj):
+        """Primera imagen válida de la galería ya resuelta (sin queries extra)."""
         images, _source = self._get_variant_gallery_cache(obj)
         img = images[0] if images else None
         if not img or not img.image:
             return None
+        return img
+
+    def get_image_url(self, obj):
+        img = self._first_image(obj)
+        if img is None:
+            return None
         request = self.context.get("request")
-        cache_url = _spec_url(img, "image_large") or _spec_url(img, "image_medium")
+        cache_url = _spec_url(img, "image_large", request=request) or _spec_url(img, "image_medium", request=request)
         return public_media_url(cache_url or img.image.url, request=request)
 
     def get_image_thumb_url(self, obj):
-        images, _source = self._get_variant_gallery_cache(obj)
-        img = images[0] if images else None
-        if not img or not img.image:
+        img = self._first_image(obj)
+        if img is None:
             return None
 
         request = self.context.get("request")
-        cache_url = _spec_url(img, "image_thumb")
+        cache_url = _spec_url(img, "image_thumb", request=request)
         if cache_url:
             return public_media_url(cache_url, request=request)
 
-        medium_url = _spec_url(img, "image_medium")
+        medium_url = _spec_url(img, "image_medium", request=request)
         if medium_url:
             return public_media_url(medium_url, request=request)
 
@@ -597,14 +917,40 @@ class ProductVariantSerializer(serializers.ModelSerializer):
 # - La política de listing prioriza payload liviano antes de caer al original.
 # ---------------------------------------------------------------------------
 
+# Campo público de URL -> clave en `_resolve_listing_image_urls`.
+_CARD_URL_KEYS = {
+    "primary_card_url": "card_image",
+    "primary_image": "primary_image",
+    "primary_thumb_url": "thumb",
+    "primary_medium_url": "medium",
+}
+
+
+class ProductCardListSerializer(serializers.ListSerializer):
+    """ListSerializer de una sola pasada para listados de productos (cards).
+
+    Mismo enfoque que `ResolvedImageListSerializer`: arma cada fila directo
+    desde `Meta.fields` del child (`_card_row`) en vez de despachar
+    `to_representation` + `get_<campo>` por cada campo y producto.
+    """
+
+    def to_representation(self, data):
+        items = data.all() if isinstance(data, models.manager.BaseManager) else data
+        child = self.child
+        field_names = tuple(child.Meta.fields)
+        card_row = child._card_row
+        return [card_row(item, field_names) for item in items]
+
+
 class ProductListSerializer(serializers.ModelSerializer):
-    category = CategorySerializer(read_only=True)
+    category = serializers.SerializerMethodField()
     primary_card_url = serializers.SerializerMethodField()
     primary_image = serializers.SerializerMethodField()
     primary_thumb_url = serializers.SerializerMethodField()
     primary_medium_url = serializers.SerializerMethodField()
-    stock_total = serializers.SerializerMethodField()
-    sold_out = serializers.SerializerMethodField()
+    # Columnas denormalizadas (ver Product.effective_stock): sin cálculo en lectura.
+    stock_total = serializers.IntegerField(source="effective_stock", read_only=True)
+    sold_out = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Product
@@ -622,67 +968,47 @@ class ProductListSerializer(serializers.ModelSerializer):
             "primary_medium_url",
             "is_active",
         ]
-
-    def _get_primary_list_image(self, obj):
-        """Imagen primaria para cards/listados.
-
-        Prioridad:
-        1) SIZE_COLOR -> prefetched_color_images priorizando primaria.
-        2) variantes prefetched + imágenes prefetched priorizando primaria.
-        3) fallback DB limpio alineado con PDP.
+        list_serializer_class = ProductCardListSerializer
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Aplica el select/prefetch/anotaciones que este serializer espera.
+
+        - category (+ department, size_guide) en el mismo SELECT.
+        - `primary_image_id` / `primary_color_image_id` por subquery; la vista
+          llama `attach_primary_list_images` sobre la página ya materializada.
+        - stock_total / sold_out salen de columnas denormalizadas: no se
+          prefetchean variantes ni se carga el pool.
+        - `description` (TextField, la columna más ancha) diferida: el listado
+          no la serializa. Se usa `defer` y no `only` porque `category` y sus
+          joins sí se serializan completos.
         """
-        schema = getattr(getattr(obj, "category", None), "variant_schema", "")
-
-        def _image_sort_key(image):
-            return (
-                0 if bool(getattr(image, "is_primary", False)) else 1,
-                int(getattr(image, "sort_order", 0) or 0),
-                getattr(image, "created_at", None),
-                int(getattr(image, "id", 0) or 0),
-            )
-
-        if schema == Category.VariantSchema.SIZE_COLOR:
-            color_images = [
-                image
-                for image in list(getattr(obj, "prefetched_color_images", None) or [])
-                if getattr(image, "image", None)
-            ]
-            if color_images:
-                color_images.sort(key=_image_sort_key)
-                return color_images[0]
-
-        variants = list(getattr(obj, "prefetched_objects_cache", {}).get("variants") or [])
-        candidate_images = []
+        return (
+            queryset.defer("description")
+            .select_related("category", "category__department", "category__size_guide")
+            .annotate(**primary_list_image_annotations())
+        )
 
-        for variant in variants:
-            variant_images = [
-                image
-                for image in list(getattr(variant, "prefetched_objects_cache", {}).get("images") or [])
-                if getattr(image, "image", None)
-            ]
-            if variant_images:
-                candidate_images.extend(variant_images)
+    def get_category(self, obj):
+        """Categoría serializada una sola vez por category_id en el request.
 
-        if candidate_images:
-            candidate_images.sort(key=_image_sort_key)
-            return candidate_images[0]
+        Una página trae pocas categorías distintas: evita correr Category +
+        Department + SizeGuide serializers por cada producto. Mismo shape que
+        `CategorySerializer`.
+        """
+        if not obj.category_id:
+            return None
 
-        # Fallback DB alineado con PDP
-        if schema == Category.VariantSchema.SIZE_COLOR:
-            color_img = (
-                ProductColorImage.objects.filter(product=obj)
-                .order_by("-is_primary", "sort_order", "created_at", "id")
-                .first()
-            )
-            if color_img and color_img.image:
-                return color_img
+        cache = self.context.setdefault("_category_payloads", {})
+        payload = cache.get(obj.category_id)
+        if payload is None:
+            payload = CategorySerializer(obj.category, context=self.context).data
+            cache[obj.category_id] = payload
+        return payload
 
-        img = (
-            ProductImage.objects.filter(variant__product=obj)
-            .order_by("-is_primary", "sort_order", "created_at", "id")
-            .first()
-        )
-        return img if img and img.image else None
+    def _get_primary_list_image(self, obj):
+        """Imagen primaria para cards/listados (ver `_resolve_primary_image`)."""
+        return _resolve_primary_image(obj)
 
     def _get_primary_list_image_urls(self, obj):
         cache = getattr(self, "_primary_list_image_urls_cache", None)
@@ -700,6 +1026,23 @@ class ProductListSerializer(serializers.ModelSerializer):
         cache[key] = resolved
         return resolved
 
+    def _card_row(self, obj, field_names):
+        """Fila del listado con el mismo shape que los campos declarados."""
+        urls = self._get_primary_list_image_urls(obj)
+        row = {}
+        for name in field_names:
+            if name in _CARD_URL_KEYS:
+                row[name] = urls[_CARD_URL_KEYS[name]]
+            elif name == "category":
+                row[name] = self.get_category(obj)
+            elif name == "price":
+                row[name] = self.fields["price"].to_representation(obj.price)
+            elif name == "stock_total":
+                row[name] = obj.effective_stock
+            else:
+                row[name] = getattr(obj, name)
+        return row
+
     def get_primary_card_url(self, obj):
         return self._get_primary_list_image_urls(obj)["card_image"]
 
@@ -712,38 +1055,6 @@ class ProductListSerializer(serializers.ModelSerializer):
     def get_primary_medium_url(self, obj):
         return self._get_primary_list_image_urls(obj)["medium"]
 
-    def get_stock_total(self, obj):
-        variants = obj.variants.filter(is_active=True)
-        # Attach serializer context for caching inside helper
-        try:
-            setattr(variants, "_serializer_ctx", self.context)
-        except Exception:
-            pass
-
-        stock_total, sold_out, pool_map = _effective_inventory_from_pool(obj.category_id, variants)
-        # Cache on serializer instance to avoid recomputing for sold_out
-        cache = getattr(self, "_product_inventory_cache", None)
-        if cache is None:
-            cache = {}
-            setattr(self, "_product_inventory_cache", cache)
-        cache[obj.id] = (stock_total, sold_out)
-        return stock_total
-
-    def get_sold_out(self, obj):
-        cache = getattr(self, "_product_inventory_cache", None) or {}
-        if obj.id in cache:
-            _stock_total, sold_out = cache[obj.id]
-            return bool(sold_out)
-
-        variants = obj.variants.filter(is_active=True)
-        try:
-            setattr(variants, "_serializer_ctx", self.context)
-        except Exception:
-            pass
-
-        _stock_total, sold_out, _pool_map = _effective_inventory_from_pool(obj.category_id, variants)
-        return bool(sold_out)
-
 
 # ---------------------------------------------------------------------------
 # Product detail (producto + variantes + imágenes)
@@ -806,37 +1117,55 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             "updated_at",
             "variants",
         ]
-    def _get_primary_detail_image(self, obj):
-        schema = getattr(getattr(obj, "category", None), "variant_schema", "")
 
-        if schema == Category.VariantSchema.SIZE_COLOR:
-            prefetched = getattr(obj, "prefetched_color_images", None)
-            if prefetched is not None:
-                candidates = sorted(
-                    [img for img in prefetched if getattr(img, "image", None)],
-                    key=lambda img: (
-                        0 if getattr(img, "is_primary", False) else 1,
-                        int(getattr(img, "sort_order", 0) or 0),
-                        getattr(img, "created_at", None),
-                    ),
-                )
-                if candidates:
-                    return candidates[0]
-            else:
-                color_img = (
-                    ProductColorImage.objects.filter(product=obj)
-                    .order_by("-is_primary", "sort_order", "created_at")
-                    .first()
-                )
-                if color_img and color_img.image:
-                    return color_img
-
-        img = (
-            ProductImage.objects.filter(variant__product=obj)
-            .order_by("-is_primary", "sort_order", "created_at")
-            .first()
+    @classmethod
+    def detail_prefetches(cls):
+        """Prefetches que la PDP espera.
+
+        - variantes activas (acotadas) + sus imágenes ordenadas en `ordered_images`.
+          El prefetch inverso ya asigna `variant.product` al producto padre, así
+          que no se hace JOIN a product/category por variante.
+        - galería por color en `prefetched_color_images`, primaria primero.
+        """
+        active_variants = (
+            ProductVariant.objects.filter(is_active=True)
+            .prefetch_related(ordered_images_prefetch())
+            .order_by("value", "color", "id")
         )
-        return img if img and img.image else None
+
+        color_images_queryset = ProductColorImage.objects.order_by(*IMAGE_ORDER)
+        if hasattr(ProductColorImage, "is_active"):
+            color_images_queryset = color_images_queryset.filter(is_active=True)
+
+        return [
+            Prefetch("variants", queryset=active_variants[:MAX_VARIANTS_PER_PRODUCT]),
+            Prefetch(
+                "color_images",
+                queryset=color_images_queryset[:MAX_COLOR_IMAGES_PER_PRODUCT],
+                to_attr="prefetched_color_images",
+            ),
+        ]
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.select_related(
+            "category", "category__department", "category__size_guide"
+        ).prefetch_related(*cls.detail_prefetches())
+
+    def to_representation(self, instance):
+        # Defensivo: si el caller no usó `setup_eager_loading` (admin, tareas,
+        # otra vista), se prefetchea aquí; lo ya cargado no se vuelve a consultar.
+        prefetch_related_objects(
+            [instance],
+            "category__department",
+            "category__size_guide",
+            *self.detail_prefetches(),
+        )
+        return super().to_representation(instance)
+
+    def _get_primary_detail_image(self, obj):
+        """Imagen primaria de la PDP (misma resolución que listados, memoizada)."""
+        return _resolve_primary_image(obj)
 
     def get_primary_image(self, obj):
         request = self.context.get("request")
@@ -844,7 +1173,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         if not img:
             return None
 
-        cache_url = _spec_url(img, "image_large") or _spec_url(img, "image_medium")
+        cache_url = _spec_url(img, "image_large", request=request) or _spec_url(img, "image_medium", request=request)
         return public_media_url(cache_url or img.image.url, request=request)
 
     def get_primary_thumb_url(self, obj):
@@ -853,7 +1182,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         if not img:
             return None
 
-        cache_url = _spec_url(img, "image_thumb")
+        cache_url = _spec_url(img, "image_thumb", request=request)
         if cache_url:
             return public_media_url(cache_url, request=request)
 
@@ -865,7 +1194,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         if not img:
             return None
 
-        cache_url = _spec_url(img, "image_medium")
+        cache_url = _spec_url(img, "image_medium", request=request)
         if cache_url:
             return public_media_url(cache_url, request=request)
 
@@ -880,13 +1209,14 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         if obj.id in cache:
             return cache[obj.id]
 
-        variants = obj.variants.filter(is_active=True)
-        try:
-            setattr(variants, "_serializer_ctx", self.context)
-        except Exception:
-            pass
+        variants = _active_variants(obj)
+        pool_map = self.context.get("pool_map")
+        if pool_map is None:
+            pool_map = _pool_map_cached(obj.category_id, self.context)
 
-        stock_total, sold_out, pool_map = _effective_inventory_from_pool(obj.category_id, variants)
+        stock_total, sold_out, pool_map = _effective_inventory_from_pool(
+            obj.category_id, variants, pool_map=pool_map
+        )
         cache[obj.id] = (stock_total, sold_out, pool_map)
         return cache[obj.id]
 
@@ -903,7 +1233,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         # No exponer variantes inactivas/eliminadas en la API.
         # La PDP recibe variants[] exactamente como estén materializadas
         # en ProductVariant según el schema de la categoría.
-        variants = list(obj.variants.filter(is_active=True))
+        variants = _active_variants(obj)
         category_slug = getattr(obj.category, "slug", None)
 
         ordered_values = sort_variant_values(
@@ -937,14 +1267,17 @@ class ProductDetailSerializer(serializers.ModelSerializer):
 # ---------------------------------------------------------------------------
 # Homepage banners (hero)
 # ---------------------------------------------------------------------------
-class HomepageBannerSerializer(serializers.ModelSerializer):
-    image = serializers.SerializerMethodField()
-    image_thumb_url = serializers.SerializerMethodField()
-    image_medium_url = serializers.SerializerMethodField()
-    image_large_url = serializers.SerializerMethodField()
+class HomepageBannerSerializer(ResolvedImageUrlsMixin, serializers.ModelSerializer):
+    primary_specs = ("image_hero", "image_large", "image_medium", "image_thumb")
+
+    image = ResolvedImageUrlField("image")
+    image_thumb_url = ResolvedImageUrlField("image_thumb_url")
+    image_medium_url = ResolvedImageUrlField("image_medium_url")
+    image_large_url = ResolvedImageUrlField("image_large_url")
 
     class Meta:
         model = HomepageBanner
+        list_serializer_class = ResolvedImageListSerializer
         fields = [
             "id",
             "title",
@@ -961,32 +1294,6 @@ class HomepageBannerSerializer(serializers.ModelSerializer):
             "sort_order",
         ]
 
-    def _get_resolved_urls(self, obj):
-        cache = self.context.setdefault("_resolved_image_urls", {})
-        key = (self.__class__.__name__, getattr(obj, "id", None))
-        if key in cache:
-            return cache[key]
-
-        resolved = _resolve_public_image_urls(
-            obj,
-            request=self.context.get("request"),
-            primary_specs=("image_hero", "image_large", "image_medium", "image_thumb"),
-        )
-        cache[key] = resolved
-        return resolved
-
-    def get_image(self, obj):
-        return self._get_resolved_urls(obj)["image"]
-
-    def get_image_thumb_url(self, obj):
-        return self._get_resolved_urls(obj)["image_thumb_url"]
-
-    def get_image_medium_url(self, obj):
-        return self._get_resolved_urls(obj)["image_medium_url"]
-
-    def get_image_large_url(self, obj):
-        return self._get_resolved_urls(obj)["image_large_url"]
-
 
 # ---------------------------------------------------------------------------
 # Homepage story / sections (editorial)
@@ -1000,14 +1307,17 @@ class HomepageStorySerializer(serializers.ModelSerializer):
 # ---------------------------------------------------------------------------
 # Homepage promos (cards / gallery)
 # ---------------------------------------------------------------------------
-class HomepagePromoSerializer(serializers.ModelSerializer):
-    image = serializers.SerializerMethodField()
-    image_thumb_url = serializers.SerializerMethodField()
-    image_medium_url = serializers.SerializerMethodField()
-    image_large_url = serializers.SerializerMethodField()
+class HomepagePromoSerializer(ResolvedImageUrlsMixin, serializers.ModelSerializer):
+    primary_specs = ("image_card", "image_large", "image_medium", "image_thumb")
+
+    image = ResolvedImageUrlField("image")
+    image_thumb_url = ResolvedImageUrlField("image_thumb_url")
+    image_medium_url = ResolvedImageUrlField("image_medium_url")
+    image_large_url = ResolvedImageUrlField("image_large_url")
 
     class Meta:
         model = HomepagePromo
+        list_serializer_class = ResolvedImageListSerializer
         fields = [
             "id",
             "title",
@@ -1023,29 +1333,3 @@ class HomepagePromoSerializer(serializers.ModelSerializer):
             "cta_url",
             "sort_order",
         ]
-
-    def _get_resolved_urls(self, obj):
-        cache = self.context.setdefault("_resolved_image_urls", {})
-        key = (self.__class__.__name__, getattr(obj, "id", None))
-        if key in cache:
-            return cache[key]
-
-        resolved = _resolve_public_image_urls(
-            obj,
-            request=self.context.get("request"),
-            primary_specs=("image_card", "image_large", "image_medium", "image_thumb"),
-        )
-        cache[key] = resolved
-        return resolved
-
-    def get_image(self, obj):
-        return self._get_resolved_urls(obj)["image"]
-
-    def get_image_thumb_url(self, obj):
-        return self._get_resolved_urls(obj)["image_thumb_url"]
-
-    def get_image_medium_url(self, obj):
-        return self._get_resolved_urls(obj)["image_medium_url"]
-
-    def get_image_large_url(self, obj):
-        return self._get_resolved_urls(obj)["image_large_url"]
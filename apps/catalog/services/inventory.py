@@ -7,6 +7,7 @@ Este módulo centraliza:
 - lectura de stock disponible desde pool
 - validación de disponibilidad
 - descuento seguro (sin race conditions) usando select_for_update
+- inventario efectivo denormalizado de Product (effective_stock / sold_out)
 
 Contrato (obligatorio):
 1) normalize(s) -> str
@@ -25,11 +26,13 @@ Keys soportadas por schema (sin cambiar la estructura del pool):
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Tuple, Any, Optional
+from operator import attrgetter
+from typing import Dict, Iterable, Tuple, Any, Optional
 
 from django.db import transaction
+from django.db.models import Prefetch
 
-from apps.catalog.models import InventoryPool
+from apps.catalog.models import InventoryPool, Product, ProductVariant
 
 
 # ======================
@@ -89,6 +92,9 @@ def _variant_category_id(variant: Any) -> Optional[int]:
         return None
 
 
+_VARIANT_POOL_FIELDS = attrgetter("is_active", "value", "color")
+
+
 def _variant_key(variant: Any) -> Tuple[str, str]:
     """Key (value,color) normalizada para usar en el pool.
 
@@ -224,6 +230,130 @@ def get_pool_map(category_id: int) -> Dict[Tuple[str, str], int]:
     return pool
 
 
+def get_pool_maps(category_ids: Iterable[int]) -> Dict[int, Dict[Tuple[str, str], int]]:
+    """Como `get_pool_map`, para varias categorías en 1 query.
+
+    Retorna {category_id: {(value, color): qty}}.
+    """
+    ids = {int(x) for x in category_ids or () if x}
+    if not ids:
+        return {}
+
+    rows = (
+        InventoryPool.objects
+        .filter(category_id__in=ids, is_active=True)
+        .values_list("category_id", "value", "color", "quantity")
+    )
+
+    pools: Dict[int, Dict[Tuple[str, str], int]] = {}
+    for category_id, value, color, qty in rows:
+        pools.setdefault(int(category_id), {})[(_norm_value(value), _norm_color(color))] = int(qty or 0)
+    return pools
+
+
+def effective_stock(
+    category_id: int,
+    variants: Iterable[Any],
+    *,
+    pool_map: Optional[Dict[Tuple[str, str], int]] = None,
+) -> int:
+    """Stock efectivo de un producto: max(stock disponible por variante activa).
+
+    NO se suma (el pool es global por base y sumar inflaría el total).
+    Todas las variantes son del mismo producto: se usa el category_id del
+    producto en vez de resolver variant.product por fila.
+    """
+    if not category_id:
+        return 0
+
+    if pool_map is None:
+        pool_map = get_pool_map(int(category_id))
+
+    max_stock = 0
+    for is_active, value, color in map(_VARIANT_POOL_FIELDS, variants):
+        if not is_active:
+            continue
+
+        available = get_available_stock(category_id, value, color, pool_map=pool_map)
+        if available > max_stock:
+            max_stock = available
+    return max_stock
+
+
+# Tamaño de lote: acota los `IN (...)` del prefetch de variantes y de pools.
+_RECOMPUTE_CHUNK_SIZE = 500
+
+
+def _iter_product_chunks(qs, product_ids=None):
+    """Lotes de `qs` (ordenado por id) de a lo sumo `_RECOMPUTE_CHUNK_SIZE` filas."""
+    if product_ids is not None:
+        ids = sorted({int(x) for x in product_ids if x})
+        for i in range(0, len(ids), _RECOMPUTE_CHUNK_SIZE):
+            products = list(qs.filter(id__in=ids[i:i + _RECOMPUTE_CHUNK_SIZE]))
+            if products:
+                yield products
+        return
+
+    last_id = 0
+    while True:
+        products = list(qs.filter(id__gt=last_id)[:_RECOMPUTE_CHUNK_SIZE])
+        if not products:
+            return
+        yield products
+        if len(products) < _RECOMPUTE_CHUNK_SIZE:
+            return
+        last_id = products[-1].id
+
+
+def _recompute_products_chunk(products) -> list:
+    """Productos del lote (con variantes activas prefetched) cuyo inventario cambió."""
+    pools = get_pool_maps(p.category_id for p in products)
+
+    changed = []
+    for product in products:
+        stock = effective_stock(
+            product.category_id,
+            product.variants.all(),
+            pool_map=pools.get(product.category_id, {}),
+        )
+        sold_out = stock <= 0
+        if product.effective_stock != stock or product.sold_out != sold_out:
+            product.effective_stock = stock
+            product.sold_out = sold_out
+            changed.append(product)
+    return changed
+
+
+def recompute_effective_inventory(product_ids=None, *, category_ids=None) -> int:
+    """Recalcula `Product.effective_stock` / `Product.sold_out` en lote.
+
+    Contract:
+    - por chunk de `_RECOMPUTE_CHUNK_SIZE` productos (keyset por id):
+      1 query de productos + 1 de variantes activas + 1 de pools
+    - solo escribe las filas que cambian (bulk_update, sin señales)
+    - retorna la cantidad de productos actualizados
+    """
+    qs = Product.objects.only("id", "category_id", "effective_stock", "sold_out").order_by("id")
+    if category_ids is not None:
+        qs = qs.filter(category_id__in=[int(x) for x in category_ids if x])
+    qs = qs.prefetch_related(
+        Prefetch(
+            "variants",
+            queryset=ProductVariant.objects.filter(is_active=True).only(
+                "id", "product_id", "value", "color", "is_active"
+            ),
+        )
+    )
+
+    updated = 0
+    for products in _iter_product_chunks(qs, product_ids):
+        changed = _recompute_products_chunk(products)
+        if changed:
+            Product.objects.bulk_update(changed, ["effective_stock", "sold_out"])
+            updated += len(changed)
+    return updated
+
+
 def get_variant_available_stock(variant: Any, *, pool_map: Optional[Dict[Tuple[str, str], int]] = None) -> int:
     """Stock disponible para una variante, derivado del InventoryPool.
 
@@ -3,8 +3,12 @@
 Este módulo es cargado por `CatalogConfig.ready()` para registrar señales de Django.
 
 Responsabilidades actuales:
-- Generar cachefiles de ImageKit después del commit al guardar imágenes del catálogo.
+- Generar cachefiles de ImageKit después del commit al guardar imágenes del catálogo
+  (no aplica si los derivados se sirven desde el CDN de imágenes).
 - Sincronizar variantes después del commit al guardar un InventoryPool.
+- Recalcular el stock legacy de Product (un UPDATE por transacción) cuando cambia el pool.
+- Mantener el inventario efectivo denormalizado de Product (effective_stock /
+  sold_out) cuando cambian el pool, las variantes o la categoría del producto.
 
 Importante:
 - Este archivo no debe contener lógica de serializers.
@@ -15,16 +19,25 @@ Importante:
 from __future__ import annotations
 
 import logging
+import threading
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from imagekit.cachefiles import ImageCacheFile
+from apps.catalog.services.inventory import recompute_effective_inventory
 from apps.catalog.services.variant_sync import sync_variants_for_pool
 
-from .models import InventoryPool, ProductImage, ProductColorImage
+from .models import (
+    InventoryPool,
+    Product,
+    ProductColorImage,
+    ProductImage,
+    ProductVariant,
+    image_cdn_enabled,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +78,7 @@ def _generate_product_color_image_cachefiles(instance: ProductColorImage) -> Non
 @receiver(post_save, sender=ProductImage)
 def productimage_post_save_generate_cache(sender, instance: ProductImage, **kwargs) -> None:
     """Eagerly generate cachefiles after saving a ProductImage when enabled."""
-    if not getattr(settings, "ENABLE_PRODUCTIMAGE_EAGER_CACHE", False):
+    if not getattr(settings, "ENABLE_PRODUCTIMAGE_EAGER_CACHE", False) or image_cdn_enabled():
         return
 
     def _run():
@@ -77,7 +90,7 @@ def productimage_post_save_generate_cache(sender, instance: ProductImage, **kwar
 @receiver(post_save, sender=ProductColorImage)
 def productcolorimage_post_save_generate_cache(sender, instance: ProductColorImage, **kwargs) -> None:
     """Eagerly generate cachefiles after saving a ProductColorImage when enabled."""
-    if not getattr(settings, "ENABLE_PRODUCTIMAGE_EAGER_CACHE", False):
+    if not getattr(settings, "ENABLE_PRODUCTIMAGE_EAGER_CACHE", False) or image_cdn_enabled():
         return
 
     def _run():
@@ -105,4 +118,84 @@ def inventorypool_post_save_sync_variants(sender, instance: InventoryPool, **kwa
     def _run():
         sync_variants_for_pool(instance.id)
 
-    transaction.on_commit(_run)
\ No newline at end of file
+    transaction.on_commit(_run)
+
+
+# -----------------------------------------------------------------------------
+# InventoryPool -> Product.stock (legacy) en lote
+# -----------------------------------------------------------------------------
+
+_pending_stock = threading.local()
+
+
+def _flush_pending_stock_recompute() -> None:
+    category_ids = getattr(_pending_stock, "category_ids", None)
+    _pending_stock.category_ids = set()
+    if category_ids:
+        Product.recompute_stock_bulk(category_ids=category_ids)
+        # Corre después de sync_variants_for_pool (registrado antes en on_commit),
+        # así también cubre las variantes que el sync desactiva con .update().
+        recompute_effective_inventory(category_ids=category_ids)
+
+
+@receiver(post_save, sender=InventoryPool)
+@receiver(post_delete, sender=InventoryPool)
+def inventorypool_changed_recompute_product_stock(sender, instance: InventoryPool, **kwargs) -> None:
+    """Acumula categorías afectadas y recalcula Product.stock una vez al commit.
+
+    Varios saves del pool en la misma transacción (carga masiva) terminan en un
+    único UPDATE; los callbacks extra encuentran el set vacío y no hacen nada.
+    """
+    if not instance.category_id:
+        return
+
+    pending = getattr(_pending_stock, "category_ids", None)
+    if pending is None:
+        pending = _pending_stock.category_ids = set()
+    pending.add(instance.category_id)
+
+    transaction.on_commit(_flush_pending_stock_recompute)
+
+
+# -----------------------------------------------------------------------------
+# ProductVariant / Product -> inventario efectivo denormalizado en lote
+# -----------------------------------------------------------------------------
+
+def _flush_pending_inventory_recompute() -> None:
+    product_ids = getattr(_pending_stock, "product_ids", None)
+    _pending_stock.product_ids = set()
+    if product_ids:
+        recompute_effective_inventory(product_ids=product_ids)
+
+
+def _queue_inventory_recompute(product_id) -> None:
+    if not product_id:
+        return
+
+    pending = getattr(_pending_stock, "product_ids", None)
+    if pending is None:
+        pending = _pending_stock.product_ids = set()
+    pending.add(product_id)
+
+    transaction.on_commit(_flush_pending_inventory_recompute)
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def productvariant_changed_recompute_inventory(sender, instance: ProductVariant, **kwargs) -> None:
+    """Recalcula effective_stock/sold_out del producto una vez al commit."""
+    _queue_inventory_recompute(instance.product_id)
+
+
+@receiver(post_save, sender=Product)
+def product_saved_recompute_inventory(sender, instance: Product, created: bool, update_fields=None, **kwargs) -> None:
+    """Un cambio de categoría cambia el pool del producto.
+
+    Productos nuevos no tienen variantes (los defaults ya son sold_out); saves
+    parciales que no tocan `category` (p. ej. `sync_stock`) no recalculan.
+    """
+    if created:
+        return
+    if update_fields is not None and "category" not in update_fields:
+        return
+    _queue_inventory_recompute(instance.pk)
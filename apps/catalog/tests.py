@@ -1,3 +1,233 @@
+"""Tests del catálogo: modelos, inventario y API pública."""
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from unittest.mock import patch
+
+from apps.catalog.models import Category, Product, ProductImage, ProductVariant
+from apps.catalog.services.inventory import recompute_effective_inventory
+from apps.common.testing import make_category, make_inventory, make_product, make_variant
+
+
+def _make_image(variant: ProductVariant, name="frente.jpg", **kwargs) -> ProductImage:
+    # Nombre de archivo ya "guardado": clean() solo valida la extensión (sin IO a storage).
+    image = ProductImage(variant=variant, image=f"products/test/{name}", **kwargs)
+    image.save()
+    return image
+
+
+class PrimaryImagePerVariantTest(TestCase):
+    """La constraint parcial garantiza una primaria; save() la traduce a ValidationError."""
+
+    def setUp(self):
+        self.category = make_category()
+        self.product = make_product(self.category)
+        self.variant = make_variant(self.product)
+
+    def test_first_image_becomes_primary(self):
+        image = _make_image(self.variant)
+        self.assertTrue(image.is_primary)
+
+    def test_second_image_is_not_primary_by_default(self):
+        _make_image(self.variant)
+        second = _make_image(self.variant, name="espalda.jpg")
+        self.assertFalse(second.is_primary)
+
+    def test_second_primary_raises_validation_error(self):
+        _make_image(self.variant)
+
+        with self.assertRaises(ValidationError) as ctx:
+            _make_image(self.variant, name="espalda.jpg", is_primary=True)
+
+        self.assertIn("is_primary", ctx.exception.message_dict)
+        self.assertEqual(
+            ProductImage.objects.filter(variant=self.variant, is_primary=True).count(),
+            1,
+        )
+
+    def test_promoting_existing_image_to_primary_raises_validation_error(self):
+        _make_image(self.variant)
+        second = _make_image(self.variant, name="espalda.jpg")
+
+        second.is_primary = True
+        with self.assertRaises(ValidationError):
+            second.save(update_fields=["is_primary"])
+
+    def test_primary_is_per_variant(self):
+        other = make_variant(self.product, value="L")
+        _make_image(self.variant)
+        image = _make_image(other, is_primary=True)
+        self.assertTrue(image.is_primary)
+
+    def test_ensure_primary_marks_first_image_in_one_update(self):
+        later, first = ProductImage.objects.bulk_create([
+            ProductImage(variant=self.variant, image="products/test/b.jpg", sort_order=1),
+            ProductImage(variant=self.variant, image="products/test/a.jpg", sort_order=0),
+        ])
+
+        with self.assertNumQueries(1):
+            ProductImage.ensure_primary_for_variants({self.variant.pk})
+
+        first.refresh_from_db()
+        later.refresh_from_db()
+        self.assertTrue(first.is_primary)
+        self.assertFalse(later.is_primary)
+
+        with self.assertNumQueries(1):
+            ProductImage.ensure_primary_for_variants({self.variant.pk})
+        self.assertEqual(ProductImage.objects.filter(variant=self.variant, is_primary=True).count(), 1)
+
+    def test_db_constraint_rejects_bulk_duplicate_primary(self):
+        """bulk_create no pasa por save(): la DB es la última barrera."""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ProductImage.objects.bulk_create([
+                ProductImage(variant=self.variant, image="products/test/a.jpg", is_primary=True),
+                ProductImage(variant=self.variant, image="products/test/b.jpg", is_primary=True),
+            ])
+
+
+class EffectiveInventoryTest(TestCase):
+    """effective_stock = máximo stock por variante activa; sold_out = effective_stock <= 0."""
+
+    def setUp(self):
+        # Schema de solo talla: el sync de variantes no depende de imágenes por color.
+        self.category = make_category("Jeans", variant_schema=Category.VariantSchema.JEAN_SIZE)
+        self.product = make_product(self.category, name="Jean Test")
+        self.variant = make_variant(self.product, value="32", color="")
+
+    def test_recompute_uses_max_of_active_variants(self):
+        make_variant(self.product, value="34", color="")
+        make_inventory(self.category, value="32", color="", quantity=3)
+        make_inventory(self.category, value="34", color="", quantity=8)
+
+        updated = recompute_effective_inventory(product_ids=[self.product.id])
+
+        self.product.refresh_from_db()
+        self.assertEqual(updated, 1)
+        self.assertEqual(self.product.effective_stock, 8, "No se suma el pool: es el máximo por variante.")
+        self.assertFalse(self.product.sold_out)
+
+    def test_recompute_ignores_inactive_variants(self):
+        make_variant(self.product, value="34", color="", is_active=False)
+        make_inventory(self.category, value="32", color="", quantity=2)
+        make_inventory(self.category, value="34", color="", quantity=9)
+
+        recompute_effective_inventory(product_ids=[self.product.id])
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_stock, 2)
+
+    def test_recompute_only_writes_changed_rows(self):
+        make_inventory(self.category, value="32", color="", quantity=5)
+
+        self.assertEqual(recompute_effective_inventory(product_ids=[self.product.id]), 1)
+        self.assertEqual(recompute_effective_inventory(product_ids=[self.product.id]), 0)
+
+    def test_recompute_without_pool_is_sold_out(self):
+        recompute_effective_inventory(category_ids=[self.category.id])
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_stock, 0)
+        self.assertTrue(self.product.sold_out)
+
+    def test_recompute_processes_every_chunk(self):
+        """Con lotes de 2, los 5 productos se recalculan (por ids y por keyset)."""
+        make_inventory(self.category, value="32", color="", quantity=4)
+        products = [self.product]
+        for i in range(4):
+            product = make_product(self.category, name=f"Jean Lote {i}")
+            make_variant(product, value="32", color="")
+            products.append(product)
+        ids = [p.id for p in products]
+
+        with patch("apps.catalog.services.inventory._RECOMPUTE_CHUNK_SIZE", 2):
+            self.assertEqual(recompute_effective_inventory(product_ids=ids), 5)
+
+            Product.objects.filter(id__in=ids).update(effective_stock=0, sold_out=True)
+            self.assertEqual(recompute_effective_inventory(), 5)
+
+        self.assertEqual(
+            set(Product.objects.filter(id__in=ids).values_list("effective_stock", "sold_out")),
+            {(4, False)},
+        )
+
+    def test_pool_change_updates_product_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pool = make_inventory(self.category, value="32", color="", quantity=7)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_stock, 7)
+        self.assertFalse(self.product.sold_out)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pool.quantity = 0
+            pool.save(update_fields=["quantity"])
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_stock, 0)
+        self.assertTrue(self.product.sold_out)
+
+    def test_variant_deactivation_updates_product_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_inventory(self.category, value="32", color="", quantity=6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant.is_active = False
+            self.variant.save(update_fields=["is_active"])
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.effective_stock, 0)
+        self.assertTrue(self.product.sold_out)
+
+
+class CategoryListConditionalGetTest(TestCase):
+    """/api/categories/ responde 304 si el ETag no cambió y uno nuevo tras editar."""
+
+    url = "/api/categories/"
+
+    def setUp(self):
+        cache.clear()
+        self.category = make_category()
+
+    def test_response_has_weak_etag_and_no_cache(self):
+        r = self.client.get(self.url)
+
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r["ETag"].startswith('W/"cat-'))
+        self.assertIn("no-cache", r["Cache-Control"])
+
+    def test_matching_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        r = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r.content, b"")
+        self.assertEqual(r["ETag"], etag)
+
+    def test_editing_a_category_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.category.name = "Camisetas Oversize"
+        self.category.save()
+
+        r = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertNotEqual(r["ETag"], etag)
+        self.assertContains(r, "Camisetas Oversize")
+
+    def test_adding_a_category_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        make_category("Hoodies")
+
+        r = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertContains(r, "Hoodies")
 
-# Create your tests here.
+    def test_etag_depends_on_page(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(self.client.get(self.url, {"page": 1})["ETag"], etag)
@@ -16,6 +16,7 @@ urlpatterns = [
     path("catalogo/", views_api.CatalogoListAPIView.as_view(), name="catalogo-list"),
     path("catalogo", views_api.CatalogoListAPIView.as_view(), name="catalogo-list-no-slash"),
     path("products/<slug:slug>/", views_api.ProductDetailAPIView.as_view(), name="product-detail"),
+    path("homepage/", views_api.HomepageBundleAPIView.as_view(), name="homepage-bundle"),
     path("homepage-banners/", views_api.HomepageBannerListAPIView.as_view(), name="homepage-banners"),
     path("homepage-promos/", views_api.HomepagePromoListAPIView.as_view(), name="homepage-promos"),
     path("homepage-story/", views_api.HomepageStoryListAPIView.as_view(), name="homepage-story"),
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 # ----------------------
 # Central variant rules
@@ -86,16 +87,53 @@ def resolve_variant_rule(
     3) default free-text rule
     """
 
+    return dict(_source_variant_rule(category_slug, variant_schema))
+
+
+def _source_variant_rule(
+    category_slug: Optional[str] = None,
+    variant_schema: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Regla fuente SIN copiar, para los helpers de solo lectura de este módulo."""
+
     slug = (category_slug or "").strip().lower()
     schema = (variant_schema or "").strip().lower()
+    return _lookup_variant_rule(slug, schema)
+
+
+@lru_cache(maxsize=32)
+def _lookup_variant_rule(slug: str, schema: str) -> Dict[str, Any]:
+    """Regla fuente (sin copiar) para slug/schema ya normalizados.
+
+    Las reglas son estáticas a nivel de módulo, así que la resolución se memoiza.
+    No mutar el dict retornado: `resolve_variant_rule` entrega copias.
+    """
 
     if slug and slug in VARIANT_RULES:
-        return dict(VARIANT_RULES[slug])
+        return VARIANT_RULES[slug]
 
     if schema and schema in SCHEMA_VARIANT_RULES:
-        return dict(SCHEMA_VARIANT_RULES[schema])
+        return SCHEMA_VARIANT_RULES[schema]
+
+    return DEFAULT_VARIANT_RULE
+
 
-    return dict(DEFAULT_VARIANT_RULE)
+@lru_cache(maxsize=64)
+def get_variant_choices(
+    category_slug: Optional[str] = None,
+    variant_schema: Optional[str] = None,
+) -> Tuple[Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]]:
+    """(allowed_values, allowed_colors) canónicos como tuplas inmutables.
+
+    Pensado para validaciones en caliente (clean() de modelos): memoizado por los
+    argumentos crudos, así que slug/schema se normalizan una vez por valor distinto
+    y no se copia la regla en cada llamada. None si la regla no restringe ese atributo.
+    """
+
+    rule = _source_variant_rule(category_slug, variant_schema)
+    values = rule.get("allowed_values")
+    colors = rule.get("allowed_colors")
+    return (tuple(values) if values else None, tuple(colors) if colors else None)
 
 
 def get_variant_rule(
@@ -124,7 +162,7 @@ def get_allowed_values_for_category(
     services, etc.) reads the same source of truth.
     """
 
-    rule = resolve_variant_rule(category_slug=category_slug, variant_schema=variant_schema)
+    rule = _source_variant_rule(category_slug, variant_schema)
     values = rule.get("allowed_values")
 
     if not values:
@@ -146,7 +184,7 @@ def get_allowed_colors_for_category(
     (e.g. 'Negro', 'Blanco', 'Beige').
     """
 
-    rule = resolve_variant_rule(category_slug=category_slug, variant_schema=variant_schema)
+    rule = _source_variant_rule(category_slug, variant_schema)
     colors = rule.get("allowed_colors")
 
     if not colors:
@@ -173,20 +211,19 @@ def sort_variant_values(
     - Duplicate values are removed while preserving first appearance.
     """
 
-    rule = resolve_variant_rule(category_slug=category_slug, variant_schema=variant_schema)
-    allowed = rule.get("allowed_values") or []
-
     if not values:
         return []
 
     normalized = [str(v).strip() for v in values if str(v).strip()]
     unique_values = list(dict.fromkeys(normalized))
 
-    if not allowed:
+    order_map = _value_order_map(
+        (category_slug or "").strip().lower(),
+        (variant_schema or "").strip().lower(),
+    )
+    if not order_map:
         return sorted(unique_values)
 
-    order_map = {value: index for index, value in enumerate(allowed)}
-
     known = [v for v in unique_values if v in order_map]
     unknown = [v for v in unique_values if v not in order_map]
 
@@ -197,6 +234,14 @@ def sort_variant_values(
 
 
 
+@lru_cache(maxsize=32)
+def _value_order_map(slug: str, schema: str) -> Dict[str, int]:
+    """{value: posición canónica} por regla; estático, se arma una vez. No mutar."""
+
+    allowed = _lookup_variant_rule(slug, schema).get("allowed_values") or []
+    return {value: index for index, value in enumerate(allowed)}
+
+
 def normalize_variant_value(value: Optional[str]) -> Optional[str]:
     """Normalize a variant value (trim + uppercase) keeping None as None."""
 
@@ -4,7 +4,8 @@ API views for the public catalog.
 
 Contract (InventoryPool as source of truth):
 - Stock is computed in serializers from InventoryPool, not from ProductVariant.stock.
-- List endpoint must avoid N+1 by loading InventoryPool for all categories in the page in ONE query.
+- List endpoints read the denormalized Product.effective_stock / sold_out
+  (kept in sync from InventoryPool by signals): no pool query per page.
 - Detail endpoint must load InventoryPool only once for the product category.
 
 This module intentionally keeps logic minimal; business rules live in:
@@ -14,21 +15,28 @@ This module intentionally keeps logic minimal; business rules live in:
 
 from __future__ import annotations
 
-from django.db.models import Prefetch, Q
+import hashlib
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Max, Prefetch, Q
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from rest_framework import generics
 from rest_framework.response import Response
 
+from apps.common.pagination import CachedCountPageNumberPagination
+from apps.common.renderers import ORJSONRenderer
+from apps.common.versioning import model_version
+
 from .models import (
     Category,
     Department,
     HomepageBanner,
     HomepageSection,
     HomepagePromo,
-    InventoryPool,
     Product,
-    ProductColorImage,
-    ProductImage,
-    ProductVariant,
 )
 from .serializers import (
     CategorySerializer,
@@ -39,40 +47,101 @@ from .serializers import (
     HomeMarqueeProductSerializer,
     ProductDetailSerializer,
     ProductListSerializer,
+    attach_primary_list_images,
 )
+from .services.inventory import get_pool_maps
+
+
+# El marquee no pagina: tope defensivo alineado con max_page_size del listing.
+MAX_MARQUEE_PRODUCTS = 100
+
+# Cache HTTP del listado (browser / CDN). Stock y precios toleran este desfase.
+PRODUCT_LIST_MAX_AGE = 30
+PRODUCT_LIST_S_MAXAGE = 60
+
+# Home (bundle y banners/promos): tope por bloque del bundle y TTL del payload por versión.
+MAX_HOMEPAGE_ITEMS = 50
+HOMEPAGE_BUNDLE_CACHE_TIMEOUT = 60
 
+# Payload del listado de categorías por versión (ver `_category_list_version`).
+CATEGORY_LIST_CACHE_TIMEOUT = 300
 
-def _build_category_pool_maps(category_ids):
-    """Build {category_id: {(value,color): qty}} in a single query."""
-    ids = [int(x) for x in set(category_ids or []) if x]
-    if not ids:
-        return {}
+# Con menos de 3 caracteres no hay trigramas útiles: ni índice ni ranking por similitud.
+MIN_TRIGRAM_SEARCH_LENGTH = 3
 
-    rows = (
-        InventoryPool.objects.filter(is_active=True, category_id__in=ids)
-        .values_list("category_id", "value", "color", "quantity")
+
+def _category_list_version() -> str:
+    """Token que cambia con cualquier edición/alta/baja de lo que serializa el listado.
+
+    Una sola query: max(updated_at) + count de Category, Department y guías de medidas.
+    """
+    agg = Category.objects.aggregate(
+        updated=Max("updated_at"),
+        total=Count("id"),
+        department_updated=Max("department__updated_at"),
+        guide_updated=Max("size_guide__updated_at"),
+        guides=Count("size_guide"),
     )
+    return "|".join(str(agg[key]) for key in sorted(agg))
 
-    out = {}
-    for cat_id, value, color, qty in rows:
-        cat_id = int(cat_id)
-        key = (str(value or "").strip().upper(), str(color or "").strip())
-        out.setdefault(cat_id, {})[key] = int(qty or 0)
-    return out
+
+def _conditional_cached_response(request, *, prefix, version, build, timeout):
+    """Response con ETag débil + payload cacheado por versión.
+
+    - El ETag/clave combinan `version` con la URL absoluta (host + página), así
+      que un cambio de datos o de página nunca reutiliza un payload viejo.
+    - If-None-Match coincidente -> 304 sin cuerpo (ni query de datos ni serializer).
+    - `build()` solo corre cuando la versión no está en cache.
+    """
+    digest = hashlib.md5(
+        f"{version}|{request.build_absolute_uri()}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    etag = f'W/"{prefix.rsplit(":", 1)[-1]}-{digest}"'
+
+    if etag in request.META.get("HTTP_IF_NONE_MATCH", ""):
+        response = HttpResponseNotModified()
+    else:
+        cache_key = f"{prefix}:{digest}"
+        data = cache.get(cache_key)
+        if data is None:
+            data = build()
+            cache.set(cache_key, data, timeout)
+        response = Response(data)
+
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
 
 
 class CategoryListAPIView(generics.ListAPIView):
-    """Flat category list for frontend to build the tree (department_id + parent_id)."""
+    """Flat category list for frontend to build the tree (department_id + parent_id).
+
+    Performance:
+    - Conditional GET: ETag derivado de `_category_list_version()` + URL (page);
+      si el cliente ya lo tiene responde 304 sin cuerpo.
+    - Payload cacheado por versión: la clave cambia al editar cualquier
+      categoría, así que no hace falta invalidar explícitamente.
+    """
 
     serializer_class = CategorySerializer
 
     def get_queryset(self):
         return (
             Category.objects.filter(is_active=True)
-            .select_related("department", "parent")
+            .select_related("department", "parent", "size_guide")
             .order_by("sort_order", "name")
         )
 
+    def list(self, request, *args, **kwargs):
+        return _conditional_cached_response(
+            request,
+            prefix="catalog:categories",
+            version=_category_list_version(),
+            build=lambda: super(CategoryListAPIView, self).list(request, *args, **kwargs).data,
+            timeout=CATEGORY_LIST_CACHE_TIMEOUT,
+        )
+
 
 # Navigation view for active categories (no pagination).
 class NavigationListAPIView(generics.ListAPIView):
@@ -102,45 +171,35 @@ class ProductListAPIView(generics.ListAPIView):
     """Product listing.
 
     Performance:
-    - Prefetch active variants + their images.
-    - Load InventoryPool for all category_ids in the page in ONE query.
+    - `ProductListSerializer.setup_eager_loading`: category joins e imagen de
+      card anotada por subquery (cargada con un solo `in_bulk` por modelo para
+      la página; no se prefetchean galerías).
+    - stock_total / sold_out vienen de columnas denormalizadas del Product.
     """
 
     serializer_class = ProductListSerializer
+    renderer_classes = [ORJSONRenderer]
+    pagination_class = CachedCountPageNumberPagination
 
-    def get_queryset(self):
-        active_variants = ProductVariant.objects.filter(is_active=True).prefetch_related(
-            Prefetch(
-                "images",
-                queryset=ProductImage.objects.order_by(
-                    "-is_primary", "sort_order", "created_at", "id"
-                ),
-            )
-        )
-
-        color_images_queryset = ProductColorImage.objects.order_by(
-            "sort_order", "id"
-        )
-        if hasattr(ProductColorImage, "is_active"):
-            color_images_queryset = color_images_queryset.filter(is_active=True)
+    # Slug de la categoría filtrada, resuelto contra la DB (ver Surrogate-Key).
+    _resolved_category_slug = None
 
-        qs = (
+    def get_queryset(self):
+        qs = ProductListSerializer.setup_eager_loading(
             Product.objects.filter(is_active=True)
-            .select_related("category", "category__department", "category__size_guide")
-            .prefetch_related(
-                Prefetch("variants", queryset=active_variants),
-                Prefetch(
-                    "color_images",
-                    queryset=color_images_queryset,
-                    to_attr="prefetched_color_images",
-                ),
-            )
-            .order_by("-created_at", "id")
-        )
+        ).order_by("-created_at", "id")
 
         category_slug = (self.request.query_params.get("category") or "").strip()
         if category_slug:
-            qs = qs.filter(category__slug=category_slug, category__is_active=True)
+            category = (
+                Category.objects.filter(slug=category_slug, is_active=True)
+                .only("id", "slug")
+                .first()
+            )
+            if category is None:
+                return qs.none()
+            self._resolved_category_slug = category.slug
+            qs = qs.filter(category_id=category.id)
 
         department_slug = (self.request.query_params.get("department") or "").strip()
         if department_slug:
@@ -148,7 +207,13 @@ class ProductListAPIView(generics.ListAPIView):
 
         search = (self.request.query_params.get("search") or "").strip()
         if search:
+            # En PostgreSQL cada rama usa su índice GIN trigram sobre UPPER(col) (migración 0015).
             qs = qs.filter(Q(name__icontains=search) | Q(description__icontains=search))
+            if len(search) >= MIN_TRIGRAM_SEARCH_LENGTH and connection.vendor == "postgresql":
+                # Relevancia: coincidencias más parecidas en el nombre primero.
+                qs = qs.annotate(search_rank=TrigramSimilarity("name", search)).order_by(
+                    "-search_rank", "-created_at", "id"
+                )
 
         return qs
 
@@ -157,116 +222,83 @@ class ProductListAPIView(generics.ListAPIView):
 
         page = self.paginate_queryset(queryset)
         items = page if page is not None else list(queryset)
+        attach_primary_list_images(items)
 
-        category_ids = [getattr(p, "category_id", None) for p in items]
-        category_pool_maps = _build_category_pool_maps(category_ids)
-
-        serializer = self.get_serializer(
-            items,
-            many=True,
-            context={
-                **self.get_serializer_context(),
-                "category_pool_maps": category_pool_maps,
-            },
-        )
+        serializer = self.get_serializer(items, many=True)
 
         if page is not None:
             return self.get_paginated_response(serializer.data)
         return Response(serializer.data)
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method == "GET" and response.status_code == 200:
+            # Respuesta idéntica para todos los anónimos por unos segundos: el
+            # browser y el CDN pueden servirla/coalescerla sin tocar Django.
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=PRODUCT_LIST_MAX_AGE,
+                s_maxage=PRODUCT_LIST_S_MAXAGE,
+            )
+            # El cuerpo va comprimido según Accept-Encoding: cachés compartidos
+            # no deben servir una variante a un cliente que no la acepta.
+            patch_vary_headers(response, ["Accept-Encoding"])
+            # Slug resuelto, no el query param crudo: un ?category= inexistente o
+            # arbitrario no crea surrogate keys nuevas.
+            response["Surrogate-Key"] = f"products cat:{self._resolved_category_slug or 'all'}"
+        return response
+
 
 # New API view for homepage marquee products
 class HomepageMarqueeProductListAPIView(generics.ListAPIView):
     """Homepage marquee products.
 
     Performance:
-    - Prefetch active variants + their images.
-    - Prefetch active color images using the same media strategy as listing.
-    - No pagination: frontend marquee consumes the full curated set.
+    - Mismo eager loading que el listing (`setup_eager_loading`).
+    - No pagination: frontend marquee consumes the full curated set,
+      acotado a MAX_MARQUEE_PRODUCTS por si la curaduría se desborda.
     """
 
     serializer_class = HomeMarqueeProductSerializer
+    renderer_classes = [ORJSONRenderer]
     pagination_class = None
 
     def get_queryset(self):
-        active_variants = ProductVariant.objects.filter(is_active=True).prefetch_related(
-            Prefetch(
-                "images",
-                queryset=ProductImage.objects.order_by(
-                    "-is_primary", "sort_order", "created_at", "id"
-                ),
-            )
-        )
-
-        color_images_queryset = ProductColorImage.objects.order_by(
-            "sort_order", "id"
-        )
-        if hasattr(ProductColorImage, "is_active"):
-            color_images_queryset = color_images_queryset.filter(is_active=True)
-
-        return (
+        return HomeMarqueeProductSerializer.setup_eager_loading(
             Product.objects.filter(is_active=True, show_in_home_marquee=True)
-            .select_related("category", "category__department")
-            .prefetch_related(
-                Prefetch("variants", queryset=active_variants),
-                Prefetch(
-                    "color_images",
-                    queryset=color_images_queryset,
-                    to_attr="prefetched_color_images",
-                ),
-            )
-            .order_by("home_marquee_order", "id")
-        )
+        ).order_by("home_marquee_order", "id")
+
+    def list(self, request, *args, **kwargs):
+        items = list(self.filter_queryset(self.get_queryset())[:MAX_MARQUEE_PRODUCTS])
+        attach_primary_list_images(items)
+        serializer = self.get_serializer(items, many=True)
+        return Response(serializer.data)
 
 
 class ProductDetailAPIView(generics.RetrieveAPIView):
     """Product detail.
 
     Performance:
-    - Prefetch active variants + their images.
+    - `ProductDetailSerializer.setup_eager_loading`: variantes activas + sus
+      imágenes ordenadas y galería por color, acotadas por producto/variante
+      (MAX_* en serializers; Django los resuelve con window function en la
+      misma query de cada prefetch).
     - Load InventoryPool once for product category.
     """
 
     serializer_class = ProductDetailSerializer
+    renderer_classes = [ORJSONRenderer]
     lookup_field = "slug"
 
     def get_queryset(self):
-        active_variants = (
-            ProductVariant.objects.filter(is_active=True)
-            .select_related("product", "product__category")
-            .prefetch_related(
-                Prefetch(
-                    "images",
-                    queryset=ProductImage.objects.order_by(
-                        "-is_primary", "sort_order", "created_at", "id"
-                    ),
-                )
-            )
-            .order_by("value", "color", "id")
-        )
-
-        color_images_queryset = ProductColorImage.objects.order_by("sort_order", "id")
-        if hasattr(ProductColorImage, "is_active"):
-            color_images_queryset = color_images_queryset.filter(is_active=True)
-
-        return (
+        return ProductDetailSerializer.setup_eager_loading(
             Product.objects.filter(is_active=True)
-            .select_related("category", "category__department", "category__size_guide")
-            .prefetch_related(
-                Prefetch("variants", queryset=active_variants),
-                Prefetch(
-                    "color_images",
-                    queryset=color_images_queryset,
-                    to_attr="prefetched_color_images",
-                ),
-            )
         )
 
     def retrieve(self, request, *args, **kwargs):
         obj = self.get_object()
-        category_pool_maps = _build_category_pool_maps(
-            [getattr(obj, "category_id", None)]
-        )
+        category_pool_maps = get_pool_maps([getattr(obj, "category_id", None)])
         pool_map = category_pool_maps.get(getattr(obj, "category_id", None), {})
 
         serializer = self.get_serializer(
@@ -282,25 +314,49 @@ class ProductDetailAPIView(generics.RetrieveAPIView):
 
 class HomepageBannerListAPIView(generics.ListAPIView):
     serializer_class = HomepageBannerSerializer
+    renderer_classes = [ORJSONRenderer]
 
     def get_queryset(self):
         return HomepageBanner.objects.filter(is_active=True).order_by(
             "sort_order", "id"
         )
 
+    def list(self, request, *args, **kwargs):
+        # Cambia poco y se pide en cada carga del home: payload por versión + ETag.
+        return _conditional_cached_response(
+            request,
+            prefix="catalog:banners",
+            version=model_version(HomepageBanner),
+            build=lambda: super(HomepageBannerListAPIView, self).list(request, *args, **kwargs).data,
+            timeout=HOMEPAGE_BUNDLE_CACHE_TIMEOUT,
+        )
+
 
 class HomepagePromoListAPIView(generics.ListAPIView):
     serializer_class = HomepagePromoSerializer
+    renderer_classes = [ORJSONRenderer]
 
     def get_queryset(self):
         qs = HomepagePromo.objects.filter(is_active=True)
 
         placement = (self.request.query_params.get("placement") or "").strip().upper()
         if placement:
-            qs = qs.filter(placement__iexact=placement)
+            # Valores guardados en mayúsculas (TextChoices): igualdad exacta,
+            # que sí usa el índice parcial (iexact compila a UPPER(...)).
+            qs = qs.filter(placement=placement)
 
         return qs.order_by("sort_order", "id")
 
+    def list(self, request, *args, **kwargs):
+        # `placement` va en la URL, que ya forma parte de la clave/ETag.
+        return _conditional_cached_response(
+            request,
+            prefix="catalog:promos",
+            version=model_version(HomepagePromo),
+            build=lambda: super(HomepagePromoListAPIView, self).list(request, *args, **kwargs).data,
+            timeout=HOMEPAGE_BUNDLE_CACHE_TIMEOUT,
+        )
+
 
 class HomepageStoryListAPIView(generics.ListAPIView):
     serializer_class = HomepageStorySerializer
@@ -311,5 +367,46 @@ class HomepageStoryListAPIView(generics.ListAPIView):
         )
 
 
+class HomepageBundleAPIView(generics.GenericAPIView):
+    """GET /api/homepage/ -> {banners, promos, story} en un solo round-trip.
+
+    Mismo contenido/orden que los endpoints individuales (que se mantienen),
+    sin paginar y acotado a MAX_HOMEPAGE_ITEMS por bloque. Payload cacheado por
+    versión (max updated_at + count de cada tabla) con ETag, como categorías.
+    """
+
+    pagination_class = None
+    renderer_classes = [ORJSONRenderer]
+
+    def get(self, request, *args, **kwargs):
+        version = "|".join(
+            model_version(model) for model in (HomepageBanner, HomepagePromo, HomepageSection)
+        )
+        return _conditional_cached_response(
+            request,
+            prefix="catalog:homepage",
+            version=version,
+            build=self._build_payload,
+            timeout=HOMEPAGE_BUNDLE_CACHE_TIMEOUT,
+        )
+
+    def _build_payload(self):
+        context = self.get_serializer_context()
+        banners = HomepageBanner.objects.filter(is_active=True).order_by("sort_order", "id")
+        promos = HomepagePromo.objects.filter(is_active=True).order_by("sort_order", "id")
+        story = HomepageSection.objects.filter(is_active=True).order_by("sort_order", "id")
+        return {
+            "banners": HomepageBannerSerializer(
+                banners[:MAX_HOMEPAGE_ITEMS], many=True, context=context
+            ).data,
+            "promos": HomepagePromoSerializer(
+                promos[:MAX_HOMEPAGE_ITEMS], many=True, context=context
+            ).data,
+            "story": HomepageStorySerializer(
+                story[:MAX_HOMEPAGE_ITEMS], many=True, context=context
+            ).data,
+        }
+
+
 # Backwards-compatible alias used in urls_api.py
 CatalogoListAPIView = ProductListAPIView
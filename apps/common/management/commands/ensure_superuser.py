@@ -2,6 +2,7 @@ import os
 
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
+from django.db.models import Q
 
 
 def _env_truthy(value: str | None) -> bool:
@@ -35,12 +36,12 @@ class Command(BaseCommand):
 
         User = get_user_model()
 
-        # Prefer username match; fallback to email match if username field differs in custom user models.
-        user_qs = User._default_manager.filter(**{User.USERNAME_FIELD: username})
-        if not user_qs.exists() and hasattr(User, "email"):
-            user_qs = User._default_manager.filter(email=email)
+        # Match by username or (if the model has it) email, in a single query.
+        lookup = Q(**{User.USERNAME_FIELD: username})
+        if hasattr(User, "email"):
+            lookup |= Q(email=email)
 
-        if user_qs.exists():
+        if User._default_manager.filter(lookup).exists():
             self.stdout.write("Superuser already exists; nothing to do.")
             return
 
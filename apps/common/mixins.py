@@ -0,0 +1,19 @@
+"""Common DRF view mixins."""
+
+from __future__ import annotations
+
+from django.utils.cache import add_never_cache_headers
+
+
+class NoClientCacheMixin:
+    """Mark every response of the view as non-cacheable (same headers as `never_cache`).
+
+    Applied once in `finalize_response` instead of wrapping each handler with
+    `method_decorator(never_cache)`, so it also covers responses DRF builds from
+    exceptions (validation errors, throttling, 404s).
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        add_never_cache_headers(response)
+        return response
@@ -7,10 +7,49 @@ behind a reverse proxy / tunnel and the external host can change.
 
 from __future__ import annotations
 
+import hashlib
 from urllib.parse import urlsplit
 
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
 
+from apps.common.versioning import model_version
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator whose COUNT(*) is cached briefly per query and table version.
+
+    Every page of a listing re-runs the same COUNT over the filtered queryset,
+    so it is shared across pages and requests. The key hashes the compiled SQL
+    with its parameters (filters included) and the model's version token
+    (max updated_at + row count), so any write to the table starts a new key.
+    Non-queryset inputs, and models without `updated_at`, use the regular count.
+    """
+
+    count_cache_timeout = 30
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None:
+            return super().count
+
+        try:
+            sql, params = query.sql_with_params()
+            version = model_version(query.model)
+        except Exception:
+            return super().count
+
+        digest = hashlib.md5(f"{version}|{sql}|{params!r}".encode(), usedforsecurity=False).hexdigest()
+        cache_key = f"pagination:count:{digest}"
+        total = cache.get(cache_key)
+        if total is None:
+            total = super().count
+            cache.set(cache_key, total, self.count_cache_timeout)
+        return total
+
 
 class RelativePageNumberPagination(PageNumberPagination):
     """PageNumberPagination that returns relative `next`/`previous` links.
@@ -27,9 +66,27 @@ class RelativePageNumberPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
 
+    # Page sizes the frontend actually sends: dict lookup instead of `_positive_int`.
+    _FAST_PAGE_SIZES = {"20": 20, "50": 50, "100": 100}
+
+    def get_page_size(self, request):
+        fast = self._FAST_PAGE_SIZES.get(request.query_params.get(self.page_size_query_param))
+        if fast is not None and fast <= self.max_page_size:
+            return fast
+        return super().get_page_size(request)
+
     def _to_relative(self, absolute_url: str | None) -> str | None:
         if not absolute_url:
             return None
+
+        # Fast path: DRF built the link with request.build_absolute_uri(), so it
+        # starts with the request's own scheme+host ("/" resolved, minus the slash).
+        request = getattr(self, "request", None)
+        if request is not None:
+            prefix = request.build_absolute_uri("/")[:-1]
+            if absolute_url.startswith(prefix):
+                return absolute_url[len(prefix):] or "/"
+
         parts = urlsplit(absolute_url)
         # Keep only path + query; drop scheme/host/fragment.
         if parts.query:
@@ -41,3 +98,12 @@ class RelativePageNumberPagination(PageNumberPagination):
 
     def get_previous_link(self):  # type: ignore[override]
         return self._to_relative(super().get_previous_link())
+
+
+class CachedCountPageNumberPagination(RelativePageNumberPagination):
+    """RelativePageNumberPagination with a short-lived cached total count.
+
+    Meant for hot public listings; admin lists keep exact counts.
+    """
+
+    django_paginator_class = CachedCountPaginator
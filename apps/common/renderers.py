@@ -0,0 +1,36 @@
+"""Common renderer utilities.
+
+This module provides a DRF JSON renderer backed by `orjson`, used by the public
+catalog endpoints whose payloads are large nested lists (products, variants,
+image URL dicts) where stdlib `json` encoding dominates response time.
+"""
+
+from __future__ import annotations
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson (same media type / contract).
+
+    orjson serializes dict/list/str subclasses (ReturnDict, ReturnList,
+    ErrorDetail) natively. Anything else (Decimal, lazy strings, querysets)
+    falls back to DRF's `JSONEncoder.default`, so the output matches the stock
+    renderer. Indentation requested via `Accept: ...; indent=N` maps to orjson's
+    only indent option (2 spaces).
+    """
+
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        option = orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context):
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=self._encoder.default, option=option)
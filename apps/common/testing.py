@@ -0,0 +1,68 @@
+"""Shared model factories for the app test suites.
+
+Each factory is idempotent (``get_or_create`` on a natural key), so tests can
+call it repeatedly with the same arguments and get the same row back.
+"""
+
+from __future__ import annotations
+
+from apps.catalog.models import (
+    Category,
+    Department,
+    InventoryPool,
+    Product,
+    ProductVariant,
+)
+from apps.customers.models import Customer
+
+
+def make_customer(**kwargs) -> Customer:
+    defaults = dict(
+        document_type="CC",
+        cedula="12345678",
+        first_name="Test",
+        last_name="User",
+        email="test@example.com",
+        phone="3001234567",
+    )
+    defaults.update(kwargs)
+    return Customer.objects.create(**defaults)
+
+
+def make_category(name: str = "Camisetas", **kwargs) -> Category:
+    dept, _ = Department.objects.get_or_create(name="Ropa", defaults={"slug": "ropa"})
+    defaults = {"name": name, "department": dept}
+    defaults.update(kwargs)
+    category, _ = Category.objects.get_or_create(slug=f"cat-{name.lower()}", defaults=defaults)
+    return category
+
+
+def make_product(category: Category, name: str = "Camiseta Test", price: int = 50_000) -> Product:
+    product, _ = Product.objects.get_or_create(
+        slug=f"prod-{name.lower().replace(' ', '-')}",
+        defaults={"name": name, "price": price, "category": category},
+    )
+    return product
+
+
+def make_variant(product: Product, value: str = "M", color: str = "Negro", is_active: bool = True) -> ProductVariant:
+    variant, _ = ProductVariant.objects.get_or_create(
+        product=product,
+        value=value,
+        color=color,
+        defaults={"is_active": is_active},
+    )
+    return variant
+
+
+def make_inventory(category: Category, value: str = "M", color: str = "Negro", quantity: int = 10) -> InventoryPool:
+    """Create or reset the pool row so it holds exactly ``quantity``."""
+    pool, _ = InventoryPool.objects.get_or_create(
+        category=category,
+        value=value,
+        color=color,
+        defaults={"quantity": quantity},
+    )
+    pool.quantity = quantity
+    pool.save(update_fields=["quantity"])
+    return pool
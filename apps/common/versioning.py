@@ -0,0 +1,11 @@
+"""Cheap change tokens for cache keys and ETags."""
+
+from __future__ import annotations
+
+from django.db.models import Count, Max
+
+
+def model_version(model) -> str:
+    """max(updated_at) + row count of a table (changes on edits, inserts and deletes)."""
+    agg = model.objects.aggregate(updated=Max("updated_at"), total=Count("id"))
+    return f"{agg['updated']}:{agg['total']}"
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-16 12:40
+
+import django.core.validators
+import re
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='cedula',
+            field=models.CharField(max_length=20, validators=[django.core.validators.RegexValidator(message='La cédula debe contener solo números (5 a 20 dígitos).', regex=re.compile('^\\d{5,20}$'))]),
+        ),
+    ]
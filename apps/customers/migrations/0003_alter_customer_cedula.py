@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-16 12:55
+
+import apps.customers.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_alter_customer_cedula'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='cedula',
+            field=models.CharField(max_length=20, validators=[apps.customers.models.validate_cedula]),
+        ),
+    ]
@@ -1,5 +1,11 @@
+from django.core.exceptions import ValidationError
 from django.db import models
-from django.core.validators import RegexValidator
+
+
+def validate_cedula(value):
+    """Solo dígitos, de 5 a 20 caracteres (equivale a ^\\d{5,20}$ sin pasar por regex)."""
+    if not (value.isdecimal() and 5 <= len(value) <= 20):
+        raise ValidationError("La cédula debe contener solo números (5 a 20 dígitos).")
 
 
 class Customer(models.Model):
@@ -15,12 +21,7 @@ class Customer(models.Model):
     )
     cedula = models.CharField(
         max_length=20,
-        validators=[
-            RegexValidator(
-                regex=r"^\d{5,20}$",
-                message="La cédula debe contener solo números (5 a 20 dígitos).",
-            )
-        ],
+        validators=[validate_cedula],
     )
 
     is_active = models.BooleanField(default=True)
@@ -35,9 +36,12 @@ class Customer(models.Model):
             self.email = self.email.strip().lower()
 
     def save(self, *args, **kwargs):
-        # Ensure normalization also happens if clean() is not explicitly called
+        # Ensure normalization also happens if clean() is not explicitly called;
+        # skip the reassignment when the value is already canonical.
         if self.email:
-            self.email = self.email.strip().lower()
+            email = self.email.strip().lower()
+            if email != self.email:
+                self.email = email
         super().save(*args, **kwargs)
 
     def __str__(self) -> str:
@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from django.db import transaction
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
 
 from apps.customers.models import Customer
 
@@ -21,14 +22,11 @@ def split_full_name(full_name: str) -> Tuple[str, str]:
 
     This is intentionally simple and predictable for checkout usage.
     """
-    name = (full_name or "").strip()
-    if not name:
+    # str.split() without args already drops empty tokens and whitespace runs.
+    parts = (full_name or "").split()
+    if not parts:
         return "", ""
 
-    parts = [p for p in name.split(" ") if p.strip()]
-    if len(parts) == 1:
-        return parts[0], ""
-
     return parts[0], " ".join(parts[1:])
 
 
@@ -36,6 +34,35 @@ def _clean_str(value: Any) -> str:
     return str(value).strip() if value is not None else ""
 
 
+CheckoutCustomerFields = Tuple[str, str, str, str, str, str]
+
+
+def _parse_checkout_payload(payload: Dict[str, Any]) -> CheckoutCustomerFields:
+    """
+    Normalize a checkout payload into
+    (document_type, cedula, first_name, last_name, email, phone).
+    """
+    document_type = _clean_str(payload.get("document_type"))
+    cedula = _clean_str(payload.get("cedula"))
+
+    if not document_type or not cedula:
+        raise ValueError("document_type y cedula son requeridos para crear/actualizar Customer.")
+
+    # Name inputs
+    full_name = _clean_str(payload.get("full_name"))
+    first_name_in = _clean_str(payload.get("first_name"))
+    last_name_in = _clean_str(payload.get("last_name"))
+
+    if full_name and (not first_name_in and not last_name_in):
+        first_name_in, last_name_in = split_full_name(full_name)
+
+    # Normalized once here (same as Customer.clean/save) so callers compare directly.
+    email_in = _clean_str(payload.get("email")).lower()
+    phone_in = _clean_str(payload.get("phone"))
+
+    return document_type, cedula, first_name_in, last_name_in, email_in, phone_in
+
+
 def get_or_create_customer_from_checkout(payload: Dict[str, Any]) -> Customer:
     """
     Centralized upsert for Customer from checkout payload.
@@ -56,59 +83,249 @@ def get_or_create_customer_from_checkout(payload: Dict[str, Any]) -> Customer:
     - email (optional)
     - phone (optional)
     """
-    document_type = _clean_str(payload.get("document_type"))
-    cedula = _clean_str(payload.get("cedula"))
+    document_type, cedula, first_name_in, last_name_in, email_in, phone_in = (
+        _parse_checkout_payload(payload)
+    )
 
-    if not document_type or not cedula:
-        raise ValueError("document_type y cedula son requeridos para crear/actualizar Customer.")
+    if connection.vendor == "postgresql":
+        return _upsert_customer_on_conflict(
+            document_type, cedula, first_name_in, last_name_in, email_in, phone_in
+        )
+    return _upsert_customer_orm(
+        document_type, cedula, first_name_in, last_name_in, email_in, phone_in
+    )
 
-    # Name inputs
-    full_name = _clean_str(payload.get("full_name"))
-    first_name_in = _clean_str(payload.get("first_name"))
-    last_name_in = _clean_str(payload.get("last_name"))
 
-    if full_name and (not first_name_in and not last_name_in):
-        first_name_in, last_name_in = split_full_name(full_name)
+# INSERT columns for `_upsert_customer_on_conflict` (same order as its params).
+_UPSERT_COLUMNS = (
+    "document_type",
+    "cedula",
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
 
-    email_in = _clean_str(payload.get("email"))
-    phone_in = _clean_str(payload.get("phone"))
 
+def _upsert_customer_on_conflict(
+    document_type: str,
+    cedula: str,
+    first_name_in: str,
+    last_name_in: str,
+    email_in: str,
+    phone_in: str,
+) -> Customer:
+    """
+    Postgres: one INSERT ... ON CONFLICT ... DO UPDATE ... RETURNING round-trip.
+
+    Applies the same update rules as `_upsert_customer_orm` in SQL, and the unique
+    (document_type, cedula) constraint resolves concurrent checkouts for the same
+    document without a SELECT first. The DO UPDATE only fires when a rule actually
+    changes a column; for an unchanged existing customer the row is read back with
+    a plain SELECT instead of being rewritten.
+    """
+    opts = Customer._meta
+    qn = connection.ops.quote_name
+    table = qn(opts.db_table)
+    col = {name: qn(opts.get_field(name).column) for name in _UPSERT_COLUMNS}
+    fields = opts.concrete_fields
+    returning = ", ".join(qn(f.column) for f in fields)
+    insert_cols = ", ".join(col[name] for name in _UPSERT_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(_UPSERT_COLUMNS))
+
+    first_name, last_name = col["first_name"], col["last_name"]
+    email, phone = col["email"], col["phone"]
+    # Same rules as `_apply_checkout_updates`: names only fill blanks; email/phone
+    # overwrite when provided and different.
+    fill_first_name = f"BTRIM({table}.{first_name}) = '' AND EXCLUDED.{first_name} <> ''"
+    fill_last_name = f"BTRIM({table}.{last_name}) = '' AND EXCLUDED.{last_name} <> ''"
+    new_email = f"EXCLUDED.{email} IS NOT NULL AND EXCLUDED.{email} IS DISTINCT FROM {table}.{email}"
+    new_phone = f"EXCLUDED.{phone} <> '' AND EXCLUDED.{phone} IS DISTINCT FROM {table}.{phone}"
+
+    sql = (
+        # Identifiers come from the fixed _UPSERT_COLUMNS tuple via _meta and are quoted
+        # with quote_name; every value is a query parameter. No user input in the SQL text.
+        f"INSERT INTO {table} ({insert_cols}) VALUES ({placeholders}) "  # nosec B608
+        f"ON CONFLICT ({col['document_type']}, {col['cedula']}) DO UPDATE SET "
+        f"{first_name} = CASE WHEN {fill_first_name} THEN EXCLUDED.{first_name} ELSE {table}.{first_name} END, "
+        f"{last_name} = CASE WHEN {fill_last_name} THEN EXCLUDED.{last_name} ELSE {table}.{last_name} END, "
+        f"{email} = CASE WHEN {new_email} THEN EXCLUDED.{email} ELSE {table}.{email} END, "
+        f"{phone} = CASE WHEN {new_phone} THEN EXCLUDED.{phone} ELSE {table}.{phone} END "
+        # Nothing to change => the existing row is not rewritten (no dead tuple / WAL).
+        f"WHERE ({fill_first_name}) OR ({fill_last_name}) OR ({new_email}) OR ({new_phone}) "
+        f"RETURNING {returning}"
+    )
+    now = timezone.now()
+    params = [
+        document_type,
+        cedula,
+        first_name_in or "",
+        last_name_in or "",
+        email_in or None,
+        phone_in or "",
+        True,
+        now,
+        now,
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    if row is None:
+        # Conflict with nothing to change: the WHERE skipped the UPDATE, so no row returned.
+        return Customer.objects.get(document_type=document_type, cedula=cedula)
+
+    return Customer.from_db(connection.alias, [f.attname for f in fields], row)
+
+
+def _apply_checkout_updates(
+    customer: Customer,
+    first_name_in: str,
+    last_name_in: str,
+    email_in: str,
+    phone_in: str,
+) -> List[str]:
+    """
+    Apply the soft-overwrite rules in memory.
+
+    Returns the names of the fields that actually changed, so callers can
+    write only those columns (`save(update_fields=...)` / `bulk_update`).
+    """
+    updates: Dict[str, str] = {}
+
+    # Email (nullable)
+    # Stored emails are already normalized by Customer.clean/save.
+    if email_in and customer.email != email_in:
+        updates["email"] = email_in
+
+    # Phone (blank allowed)
+    if phone_in and (not customer.phone or customer.phone.strip() != phone_in):
+        updates["phone"] = phone_in
+
+    # Names: only fill if empty
+    if first_name_in and not (customer.first_name or "").strip():
+        updates["first_name"] = first_name_in
+
+    if last_name_in and not (customer.last_name or "").strip():
+        updates["last_name"] = last_name_in
+
+    for field_name, value in updates.items():
+        setattr(customer, field_name, value)
+
+    return list(updates)
+
+
+def _upsert_customer_orm(
+    document_type: str,
+    cedula: str,
+    first_name_in: str,
+    last_name_in: str,
+    email_in: str,
+    phone_in: str,
+) -> Customer:
+    """
+    Portable fallback (SQLite in local dev): SELECT then INSERT/UPDATE.
+
+    The lookup locks the existing row (no-op on backends without FOR UPDATE),
+    so concurrent checkouts for the same document serialize on that row only.
+    A concurrent INSERT of a brand-new document is resolved by the unique
+    constraint: the losing INSERT rolls back its savepoint and updates the
+    row that won.
+    """
     with transaction.atomic():
-        customer = Customer.objects.filter(document_type=document_type, cedula=cedula).first()
+        customer = (
+            Customer.objects.select_for_update()
+            .filter(document_type=document_type, cedula=cedula)
+            .first()
+        )
 
         if customer is None:
-            customer = Customer.objects.create(
-                document_type=document_type,
-                cedula=cedula,
-                first_name=first_name_in or "",
-                last_name=last_name_in or "",
-                email=email_in or None,
-                phone=phone_in or "",
-            )
-            return customer
+            try:
+                with transaction.atomic():
+                    return Customer.objects.create(
+                        document_type=document_type,
+                        cedula=cedula,
+                        first_name=first_name_in or "",
+                        last_name=last_name_in or "",
+                        email=email_in or None,
+                        phone=phone_in or "",
+                    )
+            except IntegrityError:
+                customer = Customer.objects.select_for_update().get(
+                    document_type=document_type, cedula=cedula
+                )
+
+        changed_fields = _apply_checkout_updates(
+            customer, first_name_in, last_name_in, email_in, phone_in
+        )
+        if changed_fields:
+            customer.save(update_fields=changed_fields)
 
-        changed = False
+        return customer
 
-        # Email (nullable)
-        if email_in and (not customer.email or customer.email.strip().lower() != email_in.lower()):
-            customer.email = email_in
-            changed = True
 
-        # Phone (blank allowed)
-        if phone_in and (not customer.phone or customer.phone.strip() != phone_in):
-            customer.phone = phone_in
-            changed = True
+def bulk_upsert_customers(payloads: List[Dict[str, Any]]) -> List[Customer]:
+    """
+    Batch variant of `get_or_create_customer_from_checkout` (cart ingestion,
+    reconciliation jobs).
 
-        # Names: only fill if empty
-        if first_name_in and not (customer.first_name or "").strip():
-            customer.first_name = first_name_in
-            changed = True
+    One SELECT for every (document_type, cedula) in the batch, then one
+    bulk_update for existing rows and one bulk_create for new ones, all inside
+    a single transaction. Same update rules as the single-row upsert; repeated
+    documents in the batch are applied in order to the same Customer.
 
-        if last_name_in and not (customer.last_name or "").strip():
-            customer.last_name = last_name_in
-            changed = True
+    Returns the Customer for each payload, in payload order.
+    """
+    rows = [_parse_checkout_payload(payload) for payload in payloads]
+    if not rows:
+        return []
+
+    document_types = {row[0] for row in rows}
+    cedulas = {row[1] for row in rows}
+
+    with transaction.atomic():
+        # document_type__in + cedula__in is a superset of the wanted pairs; the
+        # dict below keeps only exact (document_type, cedula) matches.
+        by_key: Dict[Tuple[str, str], Customer] = {
+            (c.document_type, c.cedula): c
+            for c in Customer.objects.filter(document_type__in=document_types, cedula__in=cedulas)
+        }
+
+        to_update: Dict[int, Customer] = {}
+        update_fields: set = set()
+        to_create: Dict[Tuple[str, str], Customer] = {}
+
+        for document_type, cedula, first_name_in, last_name_in, email_in, phone_in in rows:
+            key = (document_type, cedula)
+            customer = by_key.get(key)
+
+            if customer is None:
+                customer = Customer(
+                    document_type=document_type,
+                    cedula=cedula,
+                    first_name=first_name_in or "",
+                    last_name=last_name_in or "",
+                    email=email_in or None,
+                    phone=phone_in or "",
+                )
+                by_key[key] = to_create[key] = customer
+                continue
+
+            changed_fields = _apply_checkout_updates(
+                customer, first_name_in, last_name_in, email_in, phone_in
+            )
+            if changed_fields and customer.pk is not None:
+                to_update[customer.pk] = customer
+                update_fields.update(changed_fields)
 
-        if changed:
-            customer.save(update_fields=["first_name", "last_name", "email", "phone"])
+        if to_update:
+            # Only the columns that changed somewhere in the batch.
+            Customer.objects.bulk_update(list(to_update.values()), sorted(update_fields))
+        if to_create:
+            Customer.objects.bulk_create(list(to_create.values()))
 
-        return customer
\ No newline at end of file
+    return [by_key[(row[0], row[1])] for row in rows]
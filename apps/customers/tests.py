@@ -1,3 +1,238 @@
+"""Tests del upsert de Customer desde checkout."""
+from __future__ import annotations
+
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.common.testing import make_customer
+from apps.customers.models import Customer
+from apps.customers.services.customer_upsert import (
+    _upsert_customer_on_conflict,
+    _upsert_customer_orm,
+    bulk_upsert_customers,
+    get_or_create_customer_from_checkout,
+)
+
+
+def _checkout_payload(**kwargs) -> dict:
+    payload = dict(
+        document_type="CC",
+        cedula="12345678",
+        full_name="Ana María Pérez",
+        email="ana@example.com",
+        phone="3001234567",
+    )
+    payload.update(kwargs)
+    return payload
+
+
+class CheckoutCustomerUpsertTest(TestCase):
+    """Clave document_type + cedula; email/phone se sobreescriben, nombres solo si vacíos."""
+
+    def test_creates_customer_from_full_name(self):
+        customer = get_or_create_customer_from_checkout(_checkout_payload(email=" Ana@Example.COM "))
+
+        self.assertIsNotNone(customer.pk)
+        self.assertEqual(customer.first_name, "Ana")
+        self.assertEqual(customer.last_name, "María Pérez")
+        self.assertEqual(customer.email, "ana@example.com")
+        self.assertTrue(customer.is_active)
+        self.assertEqual(Customer.objects.count(), 1)
+
+    def test_same_document_returns_same_customer(self):
+        first = get_or_create_customer_from_checkout(_checkout_payload())
+        second = get_or_create_customer_from_checkout(_checkout_payload())
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Customer.objects.count(), 1)
+
+    def test_document_type_is_part_of_the_key(self):
+        cc = get_or_create_customer_from_checkout(_checkout_payload())
+        nit = get_or_create_customer_from_checkout(_checkout_payload(document_type="NIT"))
+
+        self.assertNotEqual(cc.pk, nit.pk)
+
+    def test_email_and_phone_are_overwritten(self):
+        existing = make_customer()
+
+        customer = get_or_create_customer_from_checkout(
+            _checkout_payload(email="NUEVO@example.com", phone="3109998877")
+        )
+
+        self.assertEqual(customer.pk, existing.pk)
+        existing.refresh_from_db()
+        self.assertEqual(existing.email, "nuevo@example.com")
+        self.assertEqual(existing.phone, "3109998877")
+
+    def test_names_are_kept_when_present(self):
+        existing = make_customer()
+
+        get_or_create_customer_from_checkout(_checkout_payload(full_name="Otro Nombre"))
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.first_name, "Test")
+        self.assertEqual(existing.last_name, "User")
+
+    def test_blank_names_are_filled(self):
+        existing = make_customer(first_name="", last_name="")
+
+        get_or_create_customer_from_checkout(_checkout_payload())
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.first_name, "Ana")
+        self.assertEqual(existing.last_name, "María Pérez")
+
+    def test_empty_email_and_phone_do_not_erase(self):
+        existing = make_customer()
+
+        get_or_create_customer_from_checkout(_checkout_payload(email="", phone=""))
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.email, "test@example.com")
+        self.assertEqual(existing.phone, "3001234567")
+
+    def test_unchanged_customer_is_not_rewritten(self):
+        existing = make_customer()
+        updated_at = existing.updated_at
+
+        customer = get_or_create_customer_from_checkout(
+            _checkout_payload(full_name="Test User", email="test@example.com")
+        )
+
+        self.assertEqual(customer.pk, existing.pk)
+        existing.refresh_from_db()
+        self.assertEqual(existing.updated_at, updated_at)
+
+    def test_missing_document_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_or_create_customer_from_checkout(_checkout_payload(cedula=""))
+
+
+_PARAMS = ("CC", "12345678", "Ana", "Pérez", "ana@example.com", "3001234567")
+
+
+@skipUnless(connection.vendor == "postgresql", "INSERT ... ON CONFLICT solo en Postgres")
+class OnConflictUpsertTest(TestCase):
+    """Postgres resuelve el upsert en un round-trip."""
+
+    def test_insert_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            customer = _upsert_customer_on_conflict(*_PARAMS)
+
+        self.assertIsNotNone(customer.pk)
+        self.assertEqual(customer.email, "ana@example.com")
+
+    def test_update_returns_updated_row(self):
+        existing = make_customer(first_name="")
+
+        with self.assertNumQueries(1):
+            customer = _upsert_customer_on_conflict(*_PARAMS)
+
+        self.assertEqual(customer.pk, existing.pk)
+        self.assertEqual(customer.first_name, "Ana")
+        self.assertEqual(customer.last_name, "User")
+        self.assertEqual(customer.email, "ana@example.com")
+
+    def test_no_op_conflict_falls_back_to_select(self):
+        """Sin cambios el WHERE salta el UPDATE: no hay RETURNING y se lee la fila."""
+        existing = make_customer(first_name="Ana", last_name="Pérez", email="ana@example.com")
+
+        with self.assertNumQueries(2):
+            customer = _upsert_customer_on_conflict(*_PARAMS)
+
+        self.assertEqual(customer.pk, existing.pk)
+        self.assertEqual(customer.first_name, "Ana")
+
+
+class OrmUpsertTest(TestCase):
+    """La ruta portable aplica las mismas reglas en cualquier backend."""
+
+    def test_creates_when_missing(self):
+        customer = _upsert_customer_orm(*_PARAMS)
+
+        self.assertIsNotNone(customer.pk)
+        self.assertEqual((customer.first_name, customer.last_name), ("Ana", "Pérez"))
+
+    def test_updates_only_changed_fields(self):
+        existing = make_customer(last_name="")
+
+        customer = _upsert_customer_orm(*_PARAMS)
+
+        self.assertEqual(customer.pk, existing.pk)
+        existing.refresh_from_db()
+        self.assertEqual(existing.first_name, "Test")
+        self.assertEqual(existing.last_name, "Pérez")
+        self.assertEqual(existing.email, "ana@example.com")
+
+
+class BulkUpsertCustomersTest(TestCase):
+    """Mismas reglas que el upsert unitario, con queries que no crecen con el lote."""
+
+    def test_empty_batch_does_not_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(bulk_upsert_customers([]), [])
+
+    def test_creates_and_updates_in_payload_order(self):
+        existing = make_customer(cedula="11111111", first_name="")
+
+        customers = bulk_upsert_customers([
+            _checkout_payload(cedula="22222222", email="nuevo@example.com"),
+            _checkout_payload(cedula="11111111", email="Cambio@Example.com"),
+        ])
+
+        self.assertEqual([c.cedula for c in customers], ["22222222", "11111111"])
+        self.assertEqual(customers[1].pk, existing.pk)
+        self.assertEqual(Customer.objects.count(), 2)
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.first_name, "Ana")
+        self.assertEqual(existing.last_name, "User")
+        self.assertEqual(existing.email, "cambio@example.com")
+
+        created = Customer.objects.get(cedula="22222222")
+        self.assertEqual((created.first_name, created.email), ("Ana", "nuevo@example.com"))
+
+    def test_repeated_document_is_applied_in_order(self):
+        customers = bulk_upsert_customers([
+            _checkout_payload(email="primero@example.com"),
+            _checkout_payload(email="segundo@example.com", full_name="Otro Nombre"),
+        ])
+
+        self.assertIs(customers[0], customers[1])
+        self.assertEqual(Customer.objects.count(), 1)
+        customer = Customer.objects.get()
+        self.assertEqual(customer.email, "segundo@example.com")
+        self.assertEqual(customer.first_name, "Ana")
+
+    def test_pairs_are_matched_exactly(self):
+        """document_type__in x cedula__in es un superconjunto: no mezclar CC/NIT."""
+        make_customer(document_type="CC", cedula="11111111")
+        make_customer(document_type="NIT", cedula="22222222", email="nit@example.com")
+
+        customers = bulk_upsert_customers([
+            _checkout_payload(document_type="CC", cedula="22222222"),
+            _checkout_payload(document_type="NIT", cedula="11111111"),
+        ])
+
+        self.assertEqual(
+            [(c.document_type, c.cedula) for c in customers],
+            [("CC", "22222222"), ("NIT", "11111111")],
+        )
+        self.assertEqual(Customer.objects.count(), 4)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        def run(offset: int, size: int) -> int:
+            for i in range(size):
+                make_customer(cedula=f"{offset + i:08d}", email=f"c{offset + i}@example.com")
+            payloads = [
+                _checkout_payload(cedula=f"{offset + i:08d}", email=f"n{offset + i}@example.com")
+                for i in range(size * 2)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                bulk_upsert_customers(payloads)
+            return len(ctx.captured_queries)
 
-# Create your tests here.
+        self.assertEqual(run(10_000_000, 2), run(20_000_000, 20))
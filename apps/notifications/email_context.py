@@ -1,22 +1,53 @@
 import os
+import re
+from functools import lru_cache
 from urllib.parse import quote
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
 from apps.notifications.email_product_media import get_email_variant_image_url
 from apps.notifications.email_utils import format_cop, _build_variant_label
 
+_NON_DIGIT_RE = re.compile(r"\D+")
+
+# Mensajes de WhatsApp constantes: se codifican para URL una sola vez.
+_PAID_WHATSAPP_TEXT = quote("Hola 👋 Necesito ayuda con mi compra en Kame.col.")
+_PENDING_WHATSAPP_TEXT = quote("Hola, necesito ayuda para finalizar mi compra en Kame.col.")
+
+# Campos escalares de Order que leen los contextos de email.
+_EMAIL_ORDER_FIELDS = frozenset(
+    {"full_name", "email", "payment_reference", "payment_method", "subtotal", "shipping_cost", "total"}
+)
+
+
+def _ensure_email_fields_loaded(order) -> None:
+    """Si la orden viene de un `.only()`/`.defer()`, carga los campos faltantes en UNA query.
+
+    Evita que cada getattr() sobre un campo diferido dispare su propio SELECT.
+    Para instancias completas (caso normal) no hace nada.
+    """
+    get_deferred_fields = getattr(order, "get_deferred_fields", None)
+    if get_deferred_fields is None:
+        return
+    missing = _EMAIL_ORDER_FIELDS & get_deferred_fields()
+    if missing:
+        order.refresh_from_db(fields=sorted(missing))
+
 
 def _get_first_name(order) -> str | None:
     full_name = getattr(order, "full_name", None) or getattr(order, "customer_name", None)
 
     if full_name:
-        first = str(full_name).strip().split(" ")[0]
+        # str(): `customer_name` puede no ser un CharField; partition evita la lista de tokens.
+        first = str(full_name).strip().partition(" ")[0]
         return first.title() if first else None
 
     return None
 
 
+@lru_cache(maxsize=1)
 def _get_support_whatsapp() -> str:
     raw = getattr(
         settings,
@@ -24,10 +55,17 @@ def _get_support_whatsapp() -> str:
         getattr(settings, "NEXT_PUBLIC_WHATSAPP_PHONE", "573137008959"),
     )
     raw = (str(raw or "").strip())
-    digits = "".join(ch for ch in raw if ch.isdigit())
+    digits = _NON_DIGIT_RE.sub("", raw)
     return digits or "573137008959"
 
 
+@receiver(setting_changed)
+def _reset_support_whatsapp(*, setting, **kwargs):
+    # override_settings en tests.
+    if setting in ("SUPPORT_WHATSAPP", "NEXT_PUBLIC_WHATSAPP_PHONE"):
+        _get_support_whatsapp.cache_clear()
+
+
 def _get_brand_name() -> str:
     return "Kame.col"
 
@@ -186,6 +224,8 @@ def _build_email_items(order) -> list[dict]:
 
 
 def build_payment_confirmed_context(order) -> dict:
+    _ensure_email_fields_loaded(order)
+
     first_name = _get_first_name(order)
 
     order_number = getattr(order, "id", None)
@@ -211,8 +251,7 @@ def build_payment_confirmed_context(order) -> dict:
     support_whatsapp = _get_support_whatsapp()
     whatsapp_url = None
     if support_whatsapp:
-        msg = f"Hola 👋 Necesito ayuda con mi compra en Kame.col."
-        whatsapp_url = f"https://wa.me/{support_whatsapp}?text={quote(msg)}"
+        whatsapp_url = f"https://wa.me/{support_whatsapp}?text={_PAID_WHATSAPP_TEXT}"
 
     email_items = _build_email_items(order)
     items_count = sum(int(item.get("quantity") or 0) for item in email_items)
@@ -243,6 +282,8 @@ def build_payment_confirmed_context(order) -> dict:
 
 def build_pending_payment_reminder_context(order) -> dict:
     """Contexto para el recordatorio de pago pendiente (sin número de referencia en copy)."""
+    _ensure_email_fields_loaded(order)
+
     first_name = _get_first_name(order)
 
     to_email = (getattr(order, "email", "") or "").strip() or None
@@ -268,10 +309,7 @@ def build_pending_payment_reminder_context(order) -> dict:
     support_whatsapp = _get_support_whatsapp()
     whatsapp_url = None
     if support_whatsapp:
-        msg = (
-            "Hola, necesito ayuda para finalizar mi compra en Kame.col."
-        )
-        whatsapp_url = f"https://wa.me/{support_whatsapp}?text={quote(msg)}"
+        whatsapp_url = f"https://wa.me/{support_whatsapp}?text={_PENDING_WHATSAPP_TEXT}"
 
     email_items = _build_email_items(order)
     items_count = sum(int(item.get("quantity") or 0) for item in email_items)
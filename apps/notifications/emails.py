@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import atexit
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 from urllib import error as urllib_error
 from urllib import request as urllib_request
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections, transaction
+from django.dispatch import receiver
 from django.template.exceptions import TemplateDoesNotExist
 from django.template.loader import render_to_string
 
@@ -14,7 +21,13 @@ from apps.notifications.email_context import build_payment_confirmed_context
 
 logger = logging.getLogger(__name__)
 
+# Nombres reservados por RFC 2606: nunca entregables.
+_RESERVED_TLDS = frozenset({"example", "invalid", "test"})
+_RESERVED_DOMAINS = frozenset({"example.com", "example.net", "example.org"})
 
+
+# Settings se leen una vez por proceso; setting_changed limpia el cache (ver abajo).
+@lru_cache(maxsize=1)
 def _get_from_email() -> str:
     return getattr(settings, "DEFAULT_FROM_EMAIL", "no-reply@kamecol.local")
 
@@ -37,11 +50,47 @@ def _build_resend_headers() -> dict[str, str]:
     }
 
 
+@lru_cache(maxsize=1)
 def _should_send_real_email() -> bool:
     """Return True only when Resend is explicitly configured."""
     return bool(_get_resend_api_key())
 
 
+@lru_cache(maxsize=1)
+def _get_suppressed_recipients() -> frozenset[str]:
+    return frozenset(getattr(settings, "EMAIL_SUPPRESSED_RECIPIENTS", ()) or ())
+
+
+_SETTINGS_CACHES = {
+    "DEFAULT_FROM_EMAIL": (_get_from_email,),
+    "RESEND_API_KEY": (_should_send_real_email,),
+    "EMAIL_SUPPRESSED_RECIPIENTS": (_get_suppressed_recipients,),
+}
+
+
+@receiver(setting_changed)
+def _reset_email_settings_caches(*, setting, **kwargs):
+    # override_settings en tests.
+    for cached in _SETTINGS_CACHES.get(setting, ()):
+        cached.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def _is_undeliverable_domain(domain: str) -> bool:
+    return domain in _RESERVED_DOMAINS or domain.rpartition(".")[2] in _RESERVED_TLDS
+
+
+def _suppression_reason(to_email: str) -> Optional[str]:
+    """Motivo para no enviar a `to_email`, o None si se puede enviar."""
+    address = to_email.strip().lower()
+    if address in _get_suppressed_recipients():
+        return "suppressed"
+    local_part, _, domain = address.rpartition("@")
+    if not local_part or not domain or _is_undeliverable_domain(domain):
+        return "undeliverable-domain"
+    return None
+
+
 def _safe_send_multipart(
     *,
     subject: str,
@@ -64,6 +113,12 @@ def _safe_send_multipart(
         )
         return
 
+    # Antes de armar el payload: no gastar un request a Resend en rebotes seguros.
+    reason = _suppression_reason(to_email)
+    if reason:
+        logger.info("[emails] Skip send reason=%s to=%s subject=%s", reason, to_email, subject)
+        return
+
     payload = {
         "from": _get_from_email(),
         "to": [to_email],
@@ -201,4 +256,62 @@ def send_payment_confirmed_email(order) -> None:
         getattr(order, "id", None),
     )
     # Backward compatible alias
-    send_order_paid_email(order)
\ No newline at end of file
+    send_order_paid_email(order)
+
+
+def _send_for_order_id(send, order_id) -> None:
+    """Recarga la orden ya commiteada y envía; nunca propaga errores."""
+    from apps.orders.models import Order
+
+    try:
+        order = Order.objects.get(pk=order_id)
+        logger.info(
+            "[emails] Send %s order_id=%s to=%s status=%s",
+            getattr(send, "__name__", send),
+            order.id,
+            order.email,
+            order.status,
+        )
+        send(order)
+    except Exception:
+        logger.exception("[emails] Send failed order_id=%s", order_id)
+
+
+def _send_in_worker(send, order_id) -> None:
+    try:
+        _send_for_order_id(send, order_id)
+    finally:
+        # Conexiones del hilo worker: no dejarlas abiertas entre tareas.
+        connections.close_all()
+
+
+_email_executor: Optional[ThreadPoolExecutor] = None
+_email_executor_lock = threading.Lock()
+
+
+def _get_email_executor() -> ThreadPoolExecutor:
+    """Pool acotado (EMAIL_SEND_MAX_WORKERS hilos), creado al primer envío.
+
+    Al salir el proceso (SIGTERM/recycle de gunicorn con salida ordenada) se
+    espera a que terminen los envíos encolados.
+    """
+    global _email_executor
+    with _email_executor_lock:
+        if _email_executor is None:
+            workers = max(1, int(getattr(settings, "EMAIL_SEND_MAX_WORKERS", 2) or 1))
+            _email_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="email-send")
+            atexit.register(_email_executor.shutdown, wait=True)
+        return _email_executor
+
+
+def enqueue_order_email(send, order_id) -> None:
+    """Envía `send(order)` tras el commit.
+
+    Con EMAIL_SEND_IN_BACKGROUND (default) el envío corre en un pool de hilos
+    acotado, fuera del request; el pool se drena al apagar el proceso. Si está
+    desactivado, se envía sincrónicamente en el callback on_commit del request.
+    """
+    if getattr(settings, "EMAIL_SEND_IN_BACKGROUND", True):
+        transaction.on_commit(lambda: _get_email_executor().submit(_send_in_worker, send, order_id))
+    else:
+        transaction.on_commit(lambda: _send_for_order_id(send, order_id))
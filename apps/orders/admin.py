@@ -87,57 +87,72 @@ class OrderAdmin(admin.ModelAdmin):
 
     @admin.action(description="Confirmar pago y descontar stock")
     def confirm_payment_action(self, request, queryset):
-        ok = 0
-        failed = 0
+        """Confirma cada pedido con el service layer (una transacción por pedido).
+
+        No se agrupa todo en una sola transacción: un pedido sin stock haría rollback
+        de los demás, y el descuento/locks/correo viven en `confirm_order_payment()`.
+        Los resultados se reportan en un solo mensaje por tipo al final.
+        """
+        confirmed_ids = []
+        errors = []
+        # pk -> stock_deducted_at antes de confirmar (solo pedidos sin error)
+        prev_deducted_at_by_id = {}
 
         for order in queryset:
             try:
                 prev_deducted_at = order.stock_deducted_at
-
                 order.confirm_payment()
-                order.refresh_from_db(fields=["status", "stock_deducted_at", "email", "full_name"])
-
-                is_first_confirmation = (
-                    prev_deducted_at is None
-                    and order.stock_deducted_at is not None
-                    and order.status == "paid"
-                )
-
-                if is_first_confirmation:
-                    # Asegura payment_reference persistida (idempotente) para el correo.
-                    # Solo setea si viene vacía.
-                    if not (getattr(order, "payment_reference", "") or "").strip():
-                        order.payment_reference = (
-                            f"KME-{timezone.localdate().strftime('%Y%m%d')}-{order.id}"
-                        )
-                        order.save(update_fields=["payment_reference"])
-                        logger.info(
-                            "[admin] payment_reference generated for order_id=%s: %s",
-                            getattr(order, "pk", None),
-                            order.payment_reference,
-                        )
-
-                    # Email: NO se compone ni se envía desde Admin.
-                    # El correo "Pago confirmado" se dispara únicamente desde el service layer
-                    # para mantener un solo pipeline de envío y evitar dobles correos.
-                    self.message_user(
-                        request,
-                        f"Pedido #{order.pk}: ✅ Pago confirmado.",
-                        level=messages.SUCCESS,
-                    )
-
-                ok += 1
+                prev_deducted_at_by_id[order.pk] = prev_deducted_at
             except ValidationError as e:
-                failed += 1
-                messages.error(request, f"Pedido #{order.pk}: {e}")
+                errors.append(f"Pedido #{order.pk}: {e}")
             except Exception as e:
-                failed += 1
-                messages.error(request, f"Pedido #{order.pk}: error inesperado: {e}")
+                errors.append(f"Pedido #{order.pk}: error inesperado: {e}")
+
+        # Un solo SELECT para releer el estado de todos los pedidos confirmados.
+        refreshed = Order.objects.filter(pk__in=list(prev_deducted_at_by_id)).only(
+            "id", "status", "stock_deducted_at", "email", "full_name", "payment_reference"
+        )
+
+        for order in refreshed:
+            is_first_confirmation = (
+                prev_deducted_at_by_id[order.pk] is None
+                and order.stock_deducted_at is not None
+                and order.status == "paid"
+            )
+            if not is_first_confirmation:
+                continue
+
+            # Asegura payment_reference persistida (idempotente) para el correo.
+            # Solo setea si viene vacía.
+            if not (getattr(order, "payment_reference", "") or "").strip():
+                order.payment_reference = (
+                    f"KME-{timezone.localdate().strftime('%Y%m%d')}-{order.id}"
+                )
+                order.save(update_fields=["payment_reference"])
+                logger.info(
+                    "[admin] payment_reference generated for order_id=%s: %s",
+                    getattr(order, "pk", None),
+                    order.payment_reference,
+                )
 
+            # Email: NO se compone ni se envía desde Admin.
+            # El correo "Pago confirmado" se dispara únicamente desde el service layer
+            # para mantener un solo pipeline de envío y evitar dobles correos.
+            confirmed_ids.append(order.pk)
+
+        if confirmed_ids:
+            self.message_user(
+                request,
+                "✅ Pago confirmado: " + ", ".join(f"#{pk}" for pk in confirmed_ids),
+                level=messages.SUCCESS,
+            )
+        if errors:
+            messages.error(request, " | ".join(errors))
+        ok = len(prev_deducted_at_by_id)
         if ok:
             messages.success(request, f"Pagos confirmados: {ok}")
-        if failed and not ok:
-            messages.warning(request, f"No se pudo confirmar pago en {failed} pedido(s).")
+        if errors and not ok:
+            messages.warning(request, f"No se pudo confirmar pago en {len(errors)} pedido(s).")
 
     def save_model(self, request, obj, form, change):
         """Guarda la orden y aplica reglas de negocio desde el Admin.
@@ -203,6 +218,8 @@ class OrderAdmin(admin.ModelAdmin):
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ("order", "product_variant", "quantity", "unit_price", "created_at")
+    # Order.__str__ usa customer; ProductVariant.__str__ usa product y product.category.
+    list_select_related = ("order__customer", "product_variant__product__category")
     autocomplete_fields = ("order", "product_variant")
     search_fields = (
         "order__id",
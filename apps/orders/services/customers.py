@@ -23,7 +23,7 @@ def get_or_create_customer_from_form_data(form_data: dict) -> Customer:
     if not cedula:
         raise ValidationError("La cédula es obligatoria.")
 
-    email = (form_data.get("email") or "").strip()
+    email = (form_data.get("email") or "").strip().lower()
     phone = (form_data.get("phone") or "").strip()
     document_type = (form_data.get("document_type") or "CC").strip() or "CC"
 
@@ -168,23 +168,7 @@ def confirm_order_payment(order: Order) -> None:
             getattr(order, "email", None),
         )
 
-        def _send_paid_email() -> None:
-            logger.info(
-                "Ejecutando callback post-commit de pago confirmado para order_id=%s",
-                order_id,
-            )
-            try:
-                from apps.notifications.emails import send_payment_confirmed_email
-
-                fresh_order = Order.objects.get(pk=order_id)
-                logger.info(
-                    "Invocando send_payment_confirmed_email para order_id=%s email=%s status=%s",
-                    fresh_order.id,
-                    getattr(fresh_order, "email", None),
-                    fresh_order.status,
-                )
-                send_payment_confirmed_email(fresh_order)
-            except Exception:
-                logger.exception("Fallo enviando email de pago confirmado")
-
-        transaction.on_commit(_send_paid_email)
\ No newline at end of file
+        from apps.notifications.emails import enqueue_order_email, send_payment_confirmed_email
+
+        # Tras commit y en un hilo aparte: el envío no bloquea la respuesta.
+        enqueue_order_email(send_payment_confirmed_email, order_id)
\ No newline at end of file
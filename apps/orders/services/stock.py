@@ -363,4 +363,5 @@ def sellable_variants_queryset():
 
     from apps.catalog.models import ProductVariant  # local import
 
-    return ProductVariant.objects.filter(is_active=True)
\ No newline at end of file
+    # __str__ del variant (opciones seleccionadas del widget) lee product y product.category.
+    return ProductVariant.objects.filter(is_active=True).select_related("product__category")
\ No newline at end of file
@@ -7,22 +7,28 @@ Casos cubiertos:
   3. El inventario SÍ se descuenta al confirmar pago (confirm_order_payment)
   4. confirm_order_payment es idempotente (no doble descuento)
   5. El webhook APPROVED es idempotente (no doble descuento si se repite)
+  6. Los correos de pedido se envían tras el commit (pool acotado o síncrono)
+  7. No se envía a destinatarios suprimidos o no entregables
+  8. La acción de admin "Confirmar pago" reporta resultados agregados
 """
 from __future__ import annotations
 
 import re
 
-from django.test import TestCase
+from django.contrib import admin, messages
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from unittest.mock import patch, MagicMock
 
-from apps.catalog.models import (
-    Category,
-    Department,
-    InventoryPool,
-    Product,
-    ProductVariant,
-)
+from apps.catalog.models import ProductVariant
+from apps.common.testing import make_category, make_customer, make_inventory, make_product, make_variant
 from apps.customers.models import Customer
+from apps.notifications import emails
+from apps.orders.admin import OrderAdmin
 from apps.orders.models import Order, OrderItem
 from apps.orders.services.payments import generate_payment_reference, confirm_order_payment
 
@@ -31,58 +37,6 @@ from apps.orders.services.payments import generate_payment_reference, confirm_or
 # Helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _make_customer(**kwargs) -> Customer:
-    defaults = dict(
-        document_type="CC",
-        cedula="12345678",
-        first_name="Test",
-        last_name="User",
-        email="test@example.com",
-        phone="3001234567",
-    )
-    defaults.update(kwargs)
-    return Customer.objects.create(**defaults)
-
-
-def _make_category(name="Camisetas") -> Category:
-    dept, _ = Department.objects.get_or_create(name="Ropa", defaults={"slug": "ropa"})
-    cat, _ = Category.objects.get_or_create(
-        slug=f"cat-{name.lower()}",
-        defaults={"name": name, "department": dept},
-    )
-    return cat
-
-
-def _make_product(category: Category, name="Camiseta Test", price=50_000) -> Product:
-    product, _ = Product.objects.get_or_create(
-        slug=f"prod-{name.lower().replace(' ', '-')}",
-        defaults={"name": name, "price": price, "category": category},
-    )
-    return product
-
-
-def _make_variant(product: Product, size="M", color="Negro") -> ProductVariant:
-    variant, _ = ProductVariant.objects.get_or_create(
-        product=product,
-        size=size,
-        color=color,
-        defaults={"is_active": True},
-    )
-    return variant
-
-
-def _make_inventory(category: Category, size="M", color="Negro", quantity=10) -> InventoryPool:
-    pool, _ = InventoryPool.objects.get_or_create(
-        category=category,
-        value=size,
-        color=color,
-        defaults={"quantity": quantity},
-    )
-    pool.quantity = quantity
-    pool.save(update_fields=["quantity"])
-    return pool
-
-
 def _make_pending_order(customer: Customer, variant: ProductVariant, qty: int = 1, unit_price: int = 50_000) -> Order:
     """Crea una orden PENDING_PAYMENT con su referencia y un item."""
     order = Order.objects.create(
@@ -122,11 +76,11 @@ class PaymentReferenceFormatTest(TestCase):
     """TC-1: La referencia tiene formato KAME-{order_id}-{XXXXXX} y es única."""
 
     def setUp(self):
-        self.customer = _make_customer()
-        self.category = _make_category()
-        self.product = _make_product(self.category)
-        self.variant = _make_variant(self.product)
-        _make_inventory(self.category, quantity=20)
+        self.customer = make_customer()
+        self.category = make_category()
+        self.product = make_product(self.category)
+        self.variant = make_variant(self.product)
+        make_inventory(self.category, quantity=20)
 
     def test_reference_format(self):
         order = _make_pending_order(self.customer, self.variant)
@@ -137,7 +91,7 @@ class PaymentReferenceFormatTest(TestCase):
         # Crear varios pedidos con customers distintos para evitar UNIQUE en cedula
         refs = set()
         for i in range(5):
-            c = _make_customer(cedula=f"1000000{i}", email=f"user{i}@example.com")
+            c = make_customer(cedula=f"1000000{i}", email=f"user{i}@example.com")
             order = _make_pending_order(c, self.variant)
             refs.add(order.payment_reference)
         self.assertEqual(len(refs), 5, "Cada referencia debe ser única")
@@ -148,7 +102,7 @@ class PaymentReferenceFormatTest(TestCase):
 
     def test_generate_reference_is_unique_db_check(self):
         """generate_payment_reference no debe devolver una referencia ya usada."""
-        customer2 = _make_customer(cedula="99999999", email="other@example.com")
+        customer2 = make_customer(cedula="99999999", email="other@example.com")
         order1 = _make_pending_order(self.customer, self.variant)
         order2 = _make_pending_order(customer2, self.variant)
         self.assertNotEqual(order1.payment_reference, order2.payment_reference)
@@ -162,11 +116,11 @@ class InventoryNotDecrementedAtCheckoutTest(TestCase):
     """TC-2: El checkout crea una orden PENDING_PAYMENT sin tocar InventoryPool."""
 
     def setUp(self):
-        self.customer = _make_customer()
-        self.category = _make_category()
-        self.product = _make_product(self.category)
-        self.variant = _make_variant(self.product)
-        self.pool = _make_inventory(self.category, quantity=10)
+        self.customer = make_customer()
+        self.category = make_category()
+        self.product = make_product(self.category)
+        self.variant = make_variant(self.product)
+        self.pool = make_inventory(self.category, quantity=10)
 
     def test_stock_not_decremented_after_checkout(self):
         initial_qty = self.pool.quantity
@@ -194,11 +148,11 @@ class InventoryDecrementedOnPaymentConfirmTest(TestCase):
     """TC-3: confirm_order_payment() descuenta stock de InventoryPool."""
 
     def setUp(self):
-        self.customer = _make_customer()
-        self.category = _make_category()
-        self.product = _make_product(self.category)
-        self.variant = _make_variant(self.product)
-        self.pool = _make_inventory(self.category, quantity=10)
+        self.customer = make_customer()
+        self.category = make_category()
+        self.product = make_product(self.category)
+        self.variant = make_variant(self.product)
+        self.pool = make_inventory(self.category, quantity=10)
 
     def test_stock_decremented_after_confirm_payment(self):
         order = _make_pending_order(self.customer, self.variant, qty=3)
@@ -234,11 +188,11 @@ class IdempotentPaymentConfirmTest(TestCase):
     """TC-4: Llamar confirm_order_payment() dos veces no descuenta stock dos veces."""
 
     def setUp(self):
-        self.customer = _make_customer()
-        self.category = _make_category()
-        self.product = _make_product(self.category)
-        self.variant = _make_variant(self.product)
-        self.pool = _make_inventory(self.category, quantity=10)
+        self.customer = make_customer()
+        self.category = make_category()
+        self.product = make_product(self.category)
+        self.variant = make_variant(self.product)
+        self.pool = make_inventory(self.category, quantity=10)
 
     def test_no_double_decrement_on_double_confirm(self):
         order = _make_pending_order(self.customer, self.variant, qty=2)
@@ -285,11 +239,11 @@ class WompiWebhookIdempotencyTest(TestCase):
     """TC-5: El webhook de Wompi no descuenta stock dos veces si llega duplicado."""
 
     def setUp(self):
-        self.customer = _make_customer()
-        self.category = _make_category()
-        self.product = _make_product(self.category)
-        self.variant = _make_variant(self.product)
-        self.pool = _make_inventory(self.category, quantity=10)
+        self.customer = make_customer()
+        self.category = make_category()
+        self.product = make_product(self.category)
+        self.variant = make_variant(self.product)
+        self.pool = make_inventory(self.category, quantity=10)
 
     def _build_webhook_payload(self, reference: str, transaction_id: str = "txn-abc123") -> dict:
         return {
@@ -351,6 +305,231 @@ class WompiWebhookIdempotencyTest(TestCase):
         self.assertIn(resp2.status_code, [200, 201])
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# TC-6: Correos de pedido tras el commit
+# ─────────────────────────────────────────────────────────────────────────────
+
+class EnqueueOrderEmailTest(TestCase):
+    """TC-6: enqueue_order_email envía solo tras commit, en el pool o síncrono según settings."""
+
+    def setUp(self):
+        self.customer = make_customer()
+        self.order = Order.objects.create(customer=self.customer, email="cliente@kame.co")
+
+    @override_settings(EMAIL_SEND_IN_BACKGROUND=False)
+    def test_sync_mode_sends_after_commit(self):
+        send = MagicMock()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            emails.enqueue_order_email(send, self.order.id)
+            send.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+        send.assert_called_once()
+        self.assertEqual(send.call_args.args[0].pk, self.order.pk)
+
+    @override_settings(EMAIL_SEND_IN_BACKGROUND=True)
+    def test_background_mode_submits_to_executor(self):
+        send = MagicMock()
+        executor = MagicMock()
+
+        with patch("apps.notifications.emails._get_email_executor", return_value=executor):
+            with self.captureOnCommitCallbacks(execute=True):
+                emails.enqueue_order_email(send, self.order.id)
+                executor.submit.assert_not_called()
+
+        executor.submit.assert_called_once_with(emails._send_in_worker, send, self.order.id)
+        send.assert_not_called()
+
+    @override_settings(EMAIL_SEND_IN_BACKGROUND=False)
+    def test_rollback_does_not_send(self):
+        send = MagicMock()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    emails.enqueue_order_email(send, self.order.id)
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        send.assert_not_called()
+
+    @override_settings(EMAIL_SEND_IN_BACKGROUND=False)
+    def test_send_errors_are_logged_not_raised(self):
+        send = MagicMock(side_effect=RuntimeError("resend caído"))
+
+        with self.assertLogs("apps.notifications.emails", level="ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                emails.enqueue_order_email(send, self.order.id)
+
+        send.assert_called_once()
+
+    def test_worker_closes_its_connections_even_on_error(self):
+        send = MagicMock(side_effect=RuntimeError("resend caído"))
+
+        with patch("apps.notifications.emails.connections") as conns:
+            emails._send_in_worker(send, self.order.id)
+
+        conns.close_all.assert_called_once()
+
+    @override_settings(EMAIL_SEND_MAX_WORKERS=3)
+    def test_executor_is_bounded_and_shared(self):
+        with (
+            patch.object(emails, "_email_executor", None),
+            patch("apps.notifications.emails.atexit.register") as register,
+        ):
+            executor = emails._get_email_executor()
+            try:
+                self.assertIs(emails._get_email_executor(), executor)
+                self.assertEqual(executor._max_workers, 3)
+                register.assert_called_once_with(executor.shutdown, wait=True)
+            finally:
+                executor.shutdown(wait=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TC-7: Supresión de destinatarios
+# ─────────────────────────────────────────────────────────────────────────────
+
+@override_settings(RESEND_API_KEY="re_test", EMAIL_SUPPRESSED_RECIPIENTS=frozenset({"rebote@kame.co"}))
+class EmailSuppressionTest(TestCase):
+    """TC-7: Rebotes conocidos y dominios reservados (RFC 2606) no llegan a Resend."""
+
+    def _send(self, to_email: str) -> MagicMock:
+        with patch("apps.notifications.emails.urllib_request.urlopen") as urlopen:
+            emails._safe_send_multipart(
+                subject="Pago confirmado",
+                text_body="Hola",
+                html_body=None,
+                to_email=to_email,
+            )
+        return urlopen
+
+    def test_deliverable_recipient_is_sent(self):
+        self.assertIsNone(emails._suppression_reason("Cliente@Gmail.com"))
+        self._send("cliente@gmail.com").assert_called_once()
+
+    def test_suppressed_recipient_is_skipped(self):
+        self.assertEqual(emails._suppression_reason(" REBOTE@kame.co "), "suppressed")
+        self._send("rebote@kame.co").assert_not_called()
+
+    def test_reserved_domains_are_skipped(self):
+        for address in ("test@example.com", "a@example.net", "a@tienda.test", "a@kame.invalid", "a@"):
+            with self.subTest(address=address):
+                self.assertEqual(emails._suppression_reason(address), "undeliverable-domain")
+                self._send(address).assert_not_called()
+
+    def test_role_mailboxes_and_local_domains_are_sent(self):
+        """Solo se filtra lo que está en settings o en RFC 2606 (p. ej. el remitente por defecto)."""
+        for address in ("noreply@kame.co", "no-reply@kamecol.local"):
+            with self.subTest(address=address):
+                self.assertIsNone(emails._suppression_reason(address))
+                self._send(address).assert_called_once()
+
+    def test_suppression_list_follows_settings_changes(self):
+        """setting_changed limpia el cache del listado suprimido."""
+        with override_settings(EMAIL_SUPPRESSED_RECIPIENTS=frozenset({"otro@kame.co"})):
+            self.assertEqual(emails._suppression_reason("otro@kame.co"), "suppressed")
+            self.assertIsNone(emails._suppression_reason("rebote@kame.co"))
+
+        self.assertEqual(emails._suppression_reason("rebote@kame.co"), "suppressed")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TC-8: Acción de admin "Confirmar pago y descontar stock"
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ConfirmPaymentAdminActionTest(TestCase):
+    """TC-8: Un mensaje por tipo de resultado, no uno por pedido."""
+
+    def setUp(self):
+        self.customer = make_customer()
+        self.category = make_category()
+        self.product = make_product(self.category)
+        self.variant = make_variant(self.product)
+        self.pool = make_inventory(self.category, quantity=10)
+        self.model_admin = OrderAdmin(Order, admin.site)
+        self.user = get_user_model().objects.create_superuser("admin", "admin@kame.co", "secret")
+
+    def _run_action(self, queryset) -> list[tuple[int, str]]:
+        request = RequestFactory().post("/admin/orders/order/")
+        request.user = self.user
+        request.session = {}
+        request._messages = FallbackStorage(request)
+
+        with patch("apps.notifications.emails.send_payment_confirmed_email"):
+            self.model_admin.confirm_payment_action(request, queryset)
+
+        return [(m.level, m.message) for m in get_messages(request)]
+
+    def test_confirmed_orders_are_reported_once(self):
+        orders = [_make_pending_order(self.customer, self.variant) for _ in range(3)]
+
+        result = self._run_action(Order.objects.filter(pk__in=[o.pk for o in orders]))
+
+        self.assertEqual([level for level, _ in result], [messages.SUCCESS, messages.SUCCESS])
+        summary = result[0][1]
+        for order in orders:
+            self.assertIn(f"#{order.pk}", summary)
+        self.assertEqual(result[1][1], "Pagos confirmados: 3")
+
+        self.pool.refresh_from_db()
+        self.assertEqual(self.pool.quantity, 7)
+        self.assertEqual(
+            set(Order.objects.filter(pk__in=[o.pk for o in orders]).values_list("status", flat=True)),
+            {Order.Status.PAID},
+        )
+
+    def test_errors_are_aggregated_and_do_not_block_others(self):
+        ok = _make_pending_order(self.customer, self.variant)
+        cancelled = _make_pending_order(self.customer, self.variant)
+        Order.objects.filter(pk=cancelled.pk).update(status=Order.Status.CANCELLED)
+
+        result = self._run_action(Order.objects.filter(pk__in=[ok.pk, cancelled.pk]))
+
+        errors = [msg for level, msg in result if level == messages.ERROR]
+        self.assertEqual(len(errors), 1)
+        self.assertIn(f"Pedido #{cancelled.pk}", errors[0])
+        self.assertIn((messages.SUCCESS, "Pagos confirmados: 1"), result)
+
+        ok.refresh_from_db()
+        self.assertEqual(ok.status, Order.Status.PAID)
+
+    def test_all_failed_adds_warning(self):
+        orders = [_make_pending_order(self.customer, self.variant) for _ in range(2)]
+        Order.objects.filter(pk__in=[o.pk for o in orders]).update(status=Order.Status.CANCELLED)
+
+        result = self._run_action(Order.objects.filter(pk__in=[o.pk for o in orders]))
+
+        self.assertEqual(
+            [level for level, _ in result],
+            [messages.ERROR, messages.WARNING],
+        )
+        self.assertEqual(result[1][1], "No se pudo confirmar pago en 2 pedido(s).")
+
+    def test_confirmed_orders_are_reread_in_one_query(self):
+        for _ in range(3):
+            _make_pending_order(self.customer, self.variant)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self._run_action(Order.objects.filter(customer=self.customer))
+
+        reread = [q["sql"] for q in ctx.captured_queries if '"orders_order"."id" IN (' in q["sql"]]
+        self.assertEqual(len(reread), 1, "La relectura post-confirmación debe ser un solo SELECT.")
+
+    def test_already_confirmed_order_is_not_reported_as_new(self):
+        order = _make_pending_order(self.customer, self.variant)
+        self._run_action(Order.objects.filter(pk=order.pk))
+
+        result = self._run_action(Order.objects.filter(pk=order.pk))
+
+        self.assertNotIn("✅", " ".join(msg for _, msg in result))
+        self.pool.refresh_from_db()
+        self.assertEqual(self.pool.quantity, 9)
+
+
 class ApiHealthViewTests(TestCase):
     """GET /api/health/ — comprobar túnel (ngrok) y probes."""
 
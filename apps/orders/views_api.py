@@ -12,7 +12,6 @@ from django.conf import settings
 
 from django.db import IntegrityError, transaction
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
 from rest_framework.response import Response
@@ -31,6 +30,7 @@ class StockValidateThrottle(AnonRateThrottle):
     scope = "stock_validate"
 
 from apps.catalog.models import ProductVariant
+from apps.common.mixins import NoClientCacheMixin
 from apps.orders.models import Order
 
 from apps.orders.constants import CITY_CHOICES
@@ -126,21 +126,20 @@ def _normalize_stock_result(result: dict) -> tuple[dict, dict]:
 
 
 
-class CitiesAPIView(APIView):
+class CitiesAPIView(NoClientCacheMixin, APIView):
     """
     GET /api/orders/cities/
 
     Devuelve el catálogo de ciudades basado en CITY_CHOICES.
     """
 
-    @method_decorator(never_cache)
     def get(self, request, *args, **kwargs):
         cities = [{"code": code, "label": label} for code, label in CITY_CHOICES]
         return Response({"cities": cities})
 
 
 @method_decorator(csrf_exempt, name="dispatch")
-class StockValidateAPIView(APIView):
+class StockValidateAPIView(NoClientCacheMixin, APIView):
     """POST /api/orders/stock-validate/
 
     Validates that the requested items are sellable given current stock.
@@ -149,7 +148,6 @@ class StockValidateAPIView(APIView):
     authentication_classes = []
     throttle_classes = [StockValidateThrottle]
 
-    @method_decorator(never_cache)
     def post(self, request, *args, **kwargs):
         raw_items = request.data.get("items")
 
@@ -270,10 +268,9 @@ class StockValidateAPIView(APIView):
             return Response(payload, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ShippingQuoteAPIView(APIView):
+class ShippingQuoteAPIView(NoClientCacheMixin, APIView):
     """GET /api/orders/shipping-quote/?city_code=...&subtotal=..."""
 
-    @method_decorator(never_cache)
     def get(self, request, *args, **kwargs):
         city_code = (request.query_params.get("city_code") or "").strip()
         subtotal_raw = request.query_params.get("subtotal")
@@ -320,7 +317,7 @@ CITY_CODES = {code for code, _label in CITY_CHOICES}
 
 
 @method_decorator(csrf_exempt, name="dispatch")
-class CheckoutAPIView(APIView):
+class CheckoutAPIView(NoClientCacheMixin, APIView):
     """
     POST /api/orders/checkout/
     """
@@ -328,7 +325,6 @@ class CheckoutAPIView(APIView):
     authentication_classes = []
     throttle_classes = [CheckoutThrottle]
 
-    @method_decorator(never_cache)
     def post(self, request, *args, **kwargs):
         serializer = CheckoutSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -542,7 +538,7 @@ class CheckoutAPIView(APIView):
 # Wompi — Pasarela de pagos
 # ---------------------------------------------------------------------------
 
-class WompiSignatureAPIView(APIView):
+class WompiSignatureAPIView(NoClientCacheMixin, APIView):
     """GET /api/wompi-signature/?reference=<ref>
 
     Genera la firma de integridad para el Widget de Wompi.
@@ -552,7 +548,6 @@ class WompiSignatureAPIView(APIView):
     permission_classes = [AllowAny]
     authentication_classes = []
 
-    @method_decorator(never_cache)
     def get(self, request, *args, **kwargs):
         reference = request.query_params.get("reference", "").strip()
         if not reference:
@@ -589,7 +584,7 @@ class WompiSignatureAPIView(APIView):
 
 
 @method_decorator(csrf_exempt, name="dispatch")
-class WompiWebhookAPIView(APIView):
+class WompiWebhookAPIView(NoClientCacheMixin, APIView):
     """POST /api/orders/wompi-webhook/
 
     Recibe eventos de Wompi (transaction.updated).
@@ -601,7 +596,6 @@ class WompiWebhookAPIView(APIView):
     authentication_classes = []
     throttle_classes = []  # Los servidores de Wompi no deben ser throttleados
 
-    @method_decorator(never_cache)
     def post(self, request, *args, **kwargs):
         data = request.data
         if not isinstance(data, dict):
@@ -680,7 +674,7 @@ class WompiWebhookAPIView(APIView):
         return Response({"ok": True})
 
 
-class TransactionStatusAPIView(APIView):
+class TransactionStatusAPIView(NoClientCacheMixin, APIView):
     """GET /api/transaction-status/<reference>/
 
     Devuelve el estado de una orden por su payment_reference.
@@ -690,7 +684,6 @@ class TransactionStatusAPIView(APIView):
     permission_classes = [AllowAny]
     authentication_classes = []
 
-    @method_decorator(never_cache)
     def get(self, request, reference, *args, **kwargs):
         reference = str(reference or "").strip()
         if not reference:
@@ -328,12 +328,27 @@ DEFAULT_FILE_STORAGE = "storages.backends.s3.S3Storage"
 # Optimistic strategy generates on-demand and reuses if present.
 IMAGEKIT_DEFAULT_CACHEFILE_STRATEGY = "imagekit.cachefiles.strategies.Optimistic"
 
+# CDN de imágenes on-the-fly (ImageKit.io; no confundir con django-imagekit).
+# Si está definido, thumb/medium/large/hero/card se sirven como transformaciones por URL
+# (`?tr=w-420,h-420,f-auto,...`, WebP/AVIF según Accept) y no se generan cachefiles WebP.
+# El endpoint debe tener como origen el bucket público (R2_PUBLIC_BASE_URL).
+IMAGEKIT_ENDPOINT = os.getenv("IMAGEKIT_ENDPOINT", "").strip().rstrip("/")
+
 # Feature flag: control eager cache for ProductImage via environment variable
 ENABLE_PRODUCTIMAGE_EAGER_CACHE = os.getenv(
     "ENABLE_PRODUCTIMAGE_EAGER_CACHE",
     "False"
 ).lower() in ("1", "true", "yes", "on")
 
+# Feature flag: verificar storage.exists() de cada derivado al serializar.
+# Apagado por defecto (cada check es un HEAD a R2): la generación ocurre al subir
+# (warmup on_commit) y la estrategia Optimistic confía en ella. Útil en staging
+# para detectar derivados faltantes (se cae al original en vez de un 404).
+CATALOG_VERIFY_CACHEFILE_EXISTS = os.getenv(
+    "CATALOG_VERIFY_CACHEFILE_EXISTS",
+    "False"
+).lower() in ("1", "true", "yes", "on")
+
 # MEDIA_URL debe apuntar a la URL pública del bucket
 if R2_PUBLIC_BASE_URL:
     MEDIA_URL = f"{R2_PUBLIC_BASE_URL}/"
@@ -414,6 +429,21 @@ if not TRANSACTIONAL_FROM_EMAIL:
 DEFAULT_FROM_EMAIL = TRANSACTIONAL_FROM_EMAIL
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
 
+# Envío de emails transaccionales tras commit:
+# - EMAIL_SEND_IN_BACKGROUND=1: pool de hilos acotado (no bloquea el request; se
+#   drena al apagar el worker de forma ordenada).
+# - EMAIL_SEND_IN_BACKGROUND=0: envío síncrono en el callback on_commit del request.
+EMAIL_SEND_IN_BACKGROUND = os.getenv("EMAIL_SEND_IN_BACKGROUND", "True").lower() in ("1", "true", "yes", "on")
+EMAIL_SEND_MAX_WORKERS = int(os.getenv("EMAIL_SEND_MAX_WORKERS", "2"))
+
+# Destinatarios suprimidos (rebotes/quejas conocidos), separados por coma.
+# La capa de notificaciones no intenta enviarles.
+EMAIL_SUPPRESSED_RECIPIENTS = frozenset(
+    address.strip().lower()
+    for address in os.getenv("EMAIL_SUPPRESSED_RECIPIENTS", "").split(",")
+    if address.strip()
+)
+
 # Logging configuration
 # https://docs.djangoproject.com/en/6.0/topics/logging/
 